@@ -1,22 +1,19 @@
 """
 TubeFit - YouTube Comment Suitability Analyser
-Streamlit entry point.
+Streamlit entry point — a thin adapter over src/: it submits jobs and
+renders their results, warnings and errors.  src/ never imports Streamlit.
 """
-import time
+import threading
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 
 from src.styles import STYLES
-from src.utils import extract_video_id, format_number, generate_report_markdown
-from src.youtube_api import get_video_metadata, get_youtube_comments
-from src.gemini_ai import analyze_comments_with_gemini
-from src.cache import (
-    get_cached_comments,  set_cached_comments,
-    get_cached_metadata,  set_cached_metadata,
-    get_cached_analysis,  set_cached_analysis,
-    cache_stats,
-)
+from src.personas import PERSONA_OPTIONS
+from src.utils import extract_video_id, format_number, format_age, generate_report_markdown
+from src.config import GEMINI_WARMUP
+from src.gemini_ai import warm_up, stream_stats
+from src.jobs import submit_analysis, get_job
+from src.cache import cache_stats, COMMENT_TTL, ANALYSIS_TTL
 
 st.set_page_config(
     page_title="TubeFit – Comment Intelligence",
@@ -27,6 +24,16 @@ st.set_page_config(
 
 st.markdown(STYLES, unsafe_allow_html=True)
 
+
+@st.cache_resource(show_spinner=False)
+def _start_gemini_warm_up() -> None:
+    """Warm the Gemini client once per server process, off the render path."""
+    threading.Thread(target=warm_up, name="tubefit-gemini-warmup", daemon=True).start()
+
+
+if GEMINI_WARMUP:
+    _start_gemini_warm_up()
+
 # SIDEBAR
 with st.sidebar:
     st.markdown("""
@@ -39,7 +46,7 @@ with st.sidebar:
 
     st.markdown("### Settings")
     max_comments = st.slider(
-        "Comments to analyse", min_value=25, max_value=100, value=75, step=25,
+        "Comments to analyse", min_value=25, max_value=500, value=75, step=25,
         help="More comments = deeper analysis, slightly slower",
     )
     sort_order = st.selectbox(
@@ -56,12 +63,20 @@ with st.sidebar:
     st.markdown("<hr style='border-color:#222;margin:1rem 0;'>", unsafe_allow_html=True)
 
     st.markdown("### Cache")
-    stats = cache_stats()
+    stats  = cache_stats()
+    gemini = stream_stats()
+    budget = stats["budget"]
     st.markdown(f"""
     <div style="font-size:0.78rem;line-height:2;color:#666;">
         <span style="color:#22c55e;">&#9679;</span> Cached videos &nbsp;&nbsp;: <strong style="color:#bbb;">{stats['comments']}</strong><br>
         <span style="color:#3b82f6;">&#9679;</span> Cached analyses : <strong style="color:#bbb;">{stats['analysis']}</strong><br>
-        <span style="color:#444;">&#9679;</span> Total entries &nbsp;&nbsp;: <strong style="color:#bbb;">{stats['total']}</strong>
+        <span style="color:#444;">&#9679;</span> Total entries &nbsp;&nbsp;: <strong style="color:#bbb;">{stats['total']}</strong><br>
+        <span style="color:#444;">&#9679;</span> Hits / misses &nbsp;: <strong style="color:#bbb;">{stats['hits']} / {stats['misses']}</strong><br>
+        <span style="color:#444;">&#9679;</span> Served stale &nbsp;&nbsp;: <strong style="color:#bbb;">{stats['stale']}</strong><br>
+        <span style="color:#444;">&#9679;</span> Custom hit rate : <strong style="color:#bbb;">{stats['custom']['hit_rate']:.0%}</strong><br>
+        <span style="color:#444;">&#9679;</span> Gemini first / total : <strong style="color:#bbb;">{gemini['first_content_s']:.1f} s / {gemini['total_s']:.1f} s</strong><br>
+        <span style="color:#444;">&#9679;</span> YouTube units left : <strong style="color:#bbb;">{format_number(budget.get('youtube', {}).get('units', 0))}</strong><br>
+        <span style="color:#444;">&#9679;</span> Gemini requests left : <strong style="color:#bbb;">{budget.get('gemini', {}).get('requests', 0)}</strong>
     </div>""", unsafe_allow_html=True)
     st.markdown("<hr style='border-color:#222;margin:1rem 0;'>", unsafe_allow_html=True)
 
@@ -89,15 +104,6 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # INPUT
-PERSONA_OPTIONS = {
-    "The Debugger":      "A developer troubleshooting a specific issue. Wants to know if the code in the video actually works, or if it is broken/outdated.",
-    "The Newbie":        "A complete beginner with zero prior experience. Wants to know if the tutorial is too fast, skips steps, or assumes prior knowledge.",
-    "The Legacy User":   "Someone on older hardware or an older software version. Wants to know if the tutorial applies to their specific setup.",
-    "The Speed Learner": "An experienced person who just wants a quick overview. Wants to know if the video is concise or overly padded.",
-    "The Professional":  "A professional evaluating if this content is accurate, credible, and production-ready.",
-    "Custom":            "Describe your own situation in detail.",
-}
-
 st.markdown('<div class="input-section">', unsafe_allow_html=True)
 col_url, col_persona = st.columns([1, 1], gap="large")
 
@@ -145,296 +151,333 @@ if analyse_clicked:
         if not video_id:
             st.error("❌ Invalid YouTube URL — please check and try again.")
         else:
-            st.markdown("---")
-            bar = st.progress(0, text="Starting analysis…")
-            time.sleep(0.2)
-
-            # ── Layer 1: metadata (cached) ──────────────────────────
-            bar.progress(10, text="Fetching video information…")
-            video_meta = get_cached_metadata(video_id)
-            if video_meta is None:
-                video_meta = get_video_metadata(video_id)
-                if video_meta:
-                    set_cached_metadata(video_id, video_meta)
-
-            # ── Layer 1: comments (cached) ──────────────────────────
-            bar.progress(30, text=f"Collecting {max_comments} comments…")
-            comments = get_cached_comments(video_id)
-            comments_from_cache = comments is not None
-            if comments is None:
-                comments = get_youtube_comments(video_id, max_results=max_comments, sort_by=sort_order)
-                if comments:
-                    set_cached_comments(video_id, comments)
-
-            if not comments:
-                st.warning("⚠️ No comments found or comments are disabled for this video.")
-                bar.empty()
-            else:
-                # ── Layer 2: analysis (cached per video + persona) ──
-                bar.progress(62, text=f"Gemini is analysing {len(comments)} comments for your persona…")
-                result = get_cached_analysis(video_id, persona_description)
-                analysis_from_cache = result is not None
-                if result is None:
-                    result = analyze_comments_with_gemini(comments, persona_description)
-                    if result:
-                        set_cached_analysis(video_id, persona_description, result)
-
-                bar.progress(100, text="Analysis complete!")
-                time.sleep(0.4)
-                bar.empty()
-
-                if result:
-                    # ── Cache-hit banner ──────────────────────────────
-                    cached_parts = []
-                    if comments_from_cache:  cached_parts.append("comments")
-                    if analysis_from_cache:  cached_parts.append("AI analysis")
-                    if cached_parts:
-                        st.markdown(f"""
-                        <div style="background:rgba(34,197,94,0.06);border:1px solid rgba(34,197,94,0.2);
-                            border-left:3px solid #22c55e;border-radius:8px;padding:0.65rem 1.1rem;
-                            margin-bottom:1rem;display:flex;align-items:center;gap:0.6rem;">
-                            <span style="font-size:0.9rem;">⚡</span>
-                            <span style="color:#86efac;font-size:0.82rem;font-weight:500;">
-                                Served from cache: <strong>{", ".join(cached_parts)}</strong>
-                                &nbsp;—&nbsp; 0 API quota used for these.
-                            </span>
-                        </div>""", unsafe_allow_html=True)
-                    # Video metadata card
-                    if video_meta:
-                        thumb = (
-                            f"<img src='{video_meta['thumbnail']}' style='width:130px;border-radius:6px;flex-shrink:0;object-fit:cover;'>"
-                            if video_meta.get("thumbnail") else ""
-                        )
-                        title   = video_meta["title"]
-                        channel = video_meta["channel"]
-                        pub     = video_meta["published_at"]
-                        views   = format_number(video_meta["view_count"])
-                        likes_v = format_number(video_meta["like_count"])
-                        cmt_cnt = format_number(video_meta["comment_count"])
-                        st.markdown(f"""
-                        <div class="video-info-card">
-                            {thumb}
-                            <div style="flex:1;min-width:0;">
-                                <p style="color:#f0f0f0;font-weight:700;font-size:0.98rem;margin:0 0 0.25rem 0;
-                                          line-height:1.4;white-space:nowrap;overflow:hidden;text-overflow:ellipsis;">
-                                    {title}
-                                </p>
-                                <p style="color:#666;font-size:0.82rem;margin:0 0 0.7rem 0;">
-                                    {channel} &nbsp;·&nbsp; {pub}
-                                </p>
-                                <div style="display:flex;gap:1.2rem;flex-wrap:wrap;">
-                                    <span style="color:#666;font-size:0.78rem;">{views} views</span>
-                                    <span style="color:#666;font-size:0.78rem;">{likes_v} likes</span>
-                                    <span style="color:#666;font-size:0.78rem;">{cmt_cnt} comments</span>
-                                </div>
-                            </div>
-                        </div>""", unsafe_allow_html=True)
+            # Runs in the background; reruns only poll it (see _job_progress)
+            job = submit_analysis(video_id, persona_description, max_comments, sort_order)
+            st.session_state["job_id"]        = job.id
+            st.session_state["persona_label"] = selected_persona
+
+
+def _verdict_style(verdict: str) -> tuple[str, str, str, str]:
+    """CSS class, emoji, label and colour for a verdict."""
+    if verdict == "FIT":
+        return "verdict-fit", "✅", "FIT — Worth Watching", "#22c55e"
+    if verdict == "NO_FIT":
+        return "verdict-nofit", "❌", "NO FIT — Not Recommended", "#ef4444"
+    return "verdict-caution", "⚠️", "CAUTION — Proceed Carefully", "#eab308"
+
+
+@st.fragment(run_every=0.5)
+def _job_progress(job_id: str) -> None:
+    """
+    Redraw the progress bar — and the verdict fields streamed so far —
+    until the job finishes, then rerun the page to render the full result.
+    """
+    job = get_job(job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=job.message)
+
+    partial = dict(job.partial)
+    if "verdict" in partial:
+        v_class, v_emoji, v_text, v_color = _verdict_style(partial["verdict"])
+        confidence = partial.get("confidence_score")
+        conf_line = (
+            f'Confidence &nbsp;<strong style="color:{v_color};font-size:1rem;">{confidence}%</strong>'
+            if confidence is not None else "Scoring…"
+        )
+        st.markdown(f"""
+        <div class="{v_class}">
+            <div class="verdict-emoji">{v_emoji}</div>
+            <div class="verdict-title" style="color:{v_color};">{v_text}</div>
+            <p style="color:#777;font-size:0.85rem;margin:0.6rem 0 0 0;font-weight:400;">{conf_line}</p>
+        </div>""", unsafe_allow_html=True)
+    if "summary" in partial:
+        st.markdown(
+            f'<div class="glass-card"><p style="color:#aaa;font-size:0.92rem;line-height:1.75;margin:0;">{partial["summary"]}</p></div>',
+            unsafe_allow_html=True,
+        )
 
-                    # Verdict
-                    verdict    = result.get("verdict", "CAUTION")
-                    confidence = result.get("confidence_score", 0)
-                    difficulty = result.get("difficulty_level", "Mixed")
-
-                    if verdict == "FIT":
-                        v_class = "verdict-fit"
-                        v_emoji, v_text, v_color = "✅", "FIT — Worth Watching", "#22c55e"
-                    elif verdict == "NO_FIT":
-                        v_class = "verdict-nofit"
-                        v_emoji, v_text, v_color = "❌", "NO FIT — Not Recommended", "#ef4444"
-                    else:
-                        v_class = "verdict-caution"
-                        v_emoji, v_text, v_color = "⚠️", "CAUTION — Proceed Carefully", "#eab308"
 
+job = get_job(st.session_state.get("job_id", ""))
+if job is not None:
+    st.markdown("---")
+    for warning in (job.fetched or {}).get("warnings", []):
+        st.warning(f"⚠️ {warning}")
+    if not job.done:
+        _job_progress(job.id)
+    elif job.error:
+        st.error(f"❌ Analysis failed: {job.error}")
+    elif not job.fetched["comments"]:
+        st.warning("⚠️ No comments found or comments are disabled for this video.")
+    elif not job.result:
+        st.error("❌ Gemini could not analyse these comments — please try again.")
+    else:
+        video_id      = job.video_id
+        video_meta    = job.fetched["metadata"]
+        comments      = job.fetched["comments"]
+        comments_age  = job.fetched["comments_age"]
+        result        = job.result
+        analysis_age  = job.analysis_age
+        persona_label = st.session_state.get("persona_label", "")
+
+        # ── Cache-hit banner ──────────────────────────────
+        cached_parts = []
+        if comments_age is not None:
+            cached_parts.append(f"comments ({format_age(comments_age)})")
+        if analysis_age is not None:
+            cached_parts.append(f"AI analysis ({format_age(analysis_age)})")
+        refreshing = (
+            (comments_age or 0) > COMMENT_TTL or (analysis_age or 0) > ANALYSIS_TTL
+        )
+        refresh_note = " &nbsp;—&nbsp; refreshing in the background." if refreshing else ""
+        if cached_parts:
+            st.markdown(f"""
+            <div style="background:rgba(34,197,94,0.06);border:1px solid rgba(34,197,94,0.2);
+                border-left:3px solid #22c55e;border-radius:8px;padding:0.65rem 1.1rem;
+                margin-bottom:1rem;display:flex;align-items:center;gap:0.6rem;">
+                <span style="font-size:0.9rem;">⚡</span>
+                <span style="color:#86efac;font-size:0.82rem;font-weight:500;">
+                    Served from cache: <strong>{", ".join(cached_parts)}</strong>
+                    &nbsp;—&nbsp; 0 API quota used for these{refresh_note}
+                </span>
+            </div>""", unsafe_allow_html=True)
+        if job.matched_persona:
+            st.info(
+                "ℹ️ Your persona closely matches one already analysed for this video, "
+                f"so its verdict is shown: “{job.matched_persona}”"
+            )
+        # Video metadata card
+        if video_meta:
+            thumb = (
+                f"<img src='{video_meta['thumbnail']}' style='width:130px;border-radius:6px;flex-shrink:0;object-fit:cover;'>"
+                if video_meta.get("thumbnail") else ""
+            )
+            title   = video_meta["title"]
+            channel = video_meta["channel"]
+            pub     = video_meta["published_at"]
+            views   = format_number(video_meta["view_count"])
+            likes_v = format_number(video_meta["like_count"])
+            cmt_cnt = format_number(video_meta["comment_count"])
+            st.markdown(f"""
+            <div class="video-info-card">
+                {thumb}
+                <div style="flex:1;min-width:0;">
+                    <p style="color:#f0f0f0;font-weight:700;font-size:0.98rem;margin:0 0 0.25rem 0;
+                              line-height:1.4;white-space:nowrap;overflow:hidden;text-overflow:ellipsis;">
+                        {title}
+                    </p>
+                    <p style="color:#666;font-size:0.82rem;margin:0 0 0.7rem 0;">
+                        {channel} &nbsp;·&nbsp; {pub}
+                    </p>
+                    <div style="display:flex;gap:1.2rem;flex-wrap:wrap;">
+                        <span style="color:#666;font-size:0.78rem;">{views} views</span>
+                        <span style="color:#666;font-size:0.78rem;">{likes_v} likes</span>
+                        <span style="color:#666;font-size:0.78rem;">{cmt_cnt} comments</span>
+                    </div>
+                </div>
+            </div>""", unsafe_allow_html=True)
+
+        # Verdict
+        verdict    = result.get("verdict", "CAUTION")
+        confidence = result.get("confidence_score", 0)
+        difficulty = result.get("difficulty_level", "Mixed")
+
+        v_class, v_emoji, v_text, v_color = _verdict_style(verdict)
+
+        st.markdown(f"""
+        <div class="{v_class}">
+            <div class="verdict-emoji">{v_emoji}</div>
+            <div class="verdict-title" style="color:{v_color};">{v_text}</div>
+            <p style="color:#777;font-size:0.85rem;margin:0.6rem 0 0 0;font-weight:400;">
+                Confidence &nbsp;<strong style="color:{v_color};font-size:1rem;">{confidence}%</strong>
+                &nbsp;&nbsp;·&nbsp;&nbsp;
+                Level &nbsp;<strong style="color:#bbb;">{difficulty}</strong>
+            </p>
+        </div>""", unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # Stats row
+        s_data = result.get("sentiment_breakdown", {})
+        pos_c  = s_data.get("positive", 0)
+        neg_c  = s_data.get("negative", 0)
+        mc1, mc2, mc3, mc4 = st.columns(4)
+        with mc1:
+            st.markdown(f'<div class="metric-card"><div class="metric-value">{len(comments)}</div><div class="metric-label">Comments Read</div></div>', unsafe_allow_html=True)
+        with mc2:
+            pc = "#22c55e" if pos_c >= 50 else "#fff"
+            st.markdown(f'<div class="metric-card"><div class="metric-value" style="color:{pc};">{pos_c}%</div><div class="metric-label">Positive</div></div>', unsafe_allow_html=True)
+        with mc3:
+            nc = "#ef4444" if neg_c >= 30 else "#fff"
+            st.markdown(f'<div class="metric-card"><div class="metric-value" style="color:{nc};">{neg_c}%</div><div class="metric-label">Negative</div></div>', unsafe_allow_html=True)
+        with mc4:
+            cc = "#22c55e" if confidence >= 70 else ("#eab308" if confidence >= 45 else "#ef4444")
+            st.markdown(f'<div class="metric-card"><div class="metric-value" style="color:{cc};">{confidence}%</div><div class="metric-label">Confidence</div></div>', unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        # Tabs
+        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+            "📋 Analysis", "💬 Top Comments",
+            "📈 Sentiment", "💡 Tips & Keywords", "📥 Export"
+        ])
+
+        # Tab 1 - Analysis
+        with tab1:
+            rec = result.get("recommendation", "")
+            if rec:
+                st.markdown(f"""
+                <div style="background:#111;border:1px solid #222;border-left:3px solid #fff;
+                    border-radius:0 8px 8px 0;padding:1.1rem 1.4rem;margin-bottom:1.5rem;
+                    animation:fadeInUp 0.4s ease both;">
+                    <span style="font-size:0.68rem;color:#555;text-transform:uppercase;
+                                 letter-spacing:0.1em;font-weight:600;">Recommendation</span>
+                    <p style="color:#e5e5e5;font-size:0.93rem;margin:0.4rem 0 0 0;
+                              line-height:1.65;font-weight:500;">{rec}</p>
+                </div>""", unsafe_allow_html=True)
+
+            st.markdown('<p class="section-header">Community Consensus</p>', unsafe_allow_html=True)
+            summary = result.get("summary", "No summary.")
+            st.markdown(
+                f'<div class="glass-card"><p style="color:#aaa;font-size:0.92rem;line-height:1.75;margin:0;">{summary}</p></div>',
+                unsafe_allow_html=True,
+            )
+            pcol, rcol = st.columns(2, gap="medium")
+            with pcol:
+                st.markdown('<p class="section-header">What''s Good</p>', unsafe_allow_html=True)
+                for p in result.get("positive_aspects", []):
+                    st.markdown(f'<div class="pro-item">{p}</div>', unsafe_allow_html=True)
+            with rcol:
+                st.markdown('<p class="section-header">Red Flags</p>', unsafe_allow_html=True)
+                flags = result.get("red_flags", [])
+                if flags:
+                    for fl in flags:
+                        st.markdown(f'<div class="red-flag-item">{fl}</div>', unsafe_allow_html=True)
+                else:
+                    st.markdown('<div class="pro-item">No major red flags detected.</div>', unsafe_allow_html=True)
+            version = result.get("version_concerns", "None")
+            if version and version.lower() != "none":
+                st.markdown('<p class="section-header" style="margin-top:1.2rem;">Compatibility Note</p>', unsafe_allow_html=True)
+                st.markdown(f"""
+                <div style="background:#161200;border:1px solid #2e2800;border-left:3px solid #eab308;
+                    border-radius:0 7px 7px 0;padding:0.85rem 1.1rem;">
+                    <p style="color:#ca8a04;font-size:0.88rem;margin:0;line-height:1.6;">{version}</p>
+                </div>""", unsafe_allow_html=True)
+
+        # Tab 2 - Top Comments
+        with tab2:
+            if show_top_comments:
+                st.markdown('<p class="section-header">Top Liked Comments</p>', unsafe_allow_html=True)
+                for i, c in enumerate(comments[:10]):
+                    likes_str = format_number(c["likes"]) if c["likes"] > 0 else "—"
+                    author    = c["author"]
+                    pub_at    = c["published_at"]
+                    text_raw  = c["text"]
+                    text_disp = text_raw[:320] + ("..." if len(text_raw) > 320 else "")
                     st.markdown(f"""
-                    <div class="{v_class}">
-                        <div class="verdict-emoji">{v_emoji}</div>
-                        <div class="verdict-title" style="color:{v_color};">{v_text}</div>
-                        <p style="color:#777;font-size:0.85rem;margin:0.6rem 0 0 0;font-weight:400;">
-                            Confidence &nbsp;<strong style="color:{v_color};font-size:1rem;">{confidence}%</strong>
-                            &nbsp;&nbsp;·&nbsp;&nbsp;
-                            Level &nbsp;<strong style="color:#bbb;">{difficulty}</strong>
-                        </p>
+                    <div class="comment-card" style="animation-delay:{i * 0.05}s;">
+                        <div style="display:flex;justify-content:space-between;align-items:center;">
+                            <span class="comment-author">{author}</span>
+                            <span class="comment-likes">{likes_str} likes · {pub_at}</span>
+                        </div>
+                        <p class="comment-text">{text_disp}</p>
                     </div>""", unsafe_allow_html=True)
-
-                    st.markdown("<br>", unsafe_allow_html=True)
-
-                    # Stats row
-                    s_data = result.get("sentiment_breakdown", {})
-                    pos_c  = s_data.get("positive", 0)
-                    neg_c  = s_data.get("negative", 0)
-                    mc1, mc2, mc3, mc4 = st.columns(4)
-                    with mc1:
-                        st.markdown(f'<div class="metric-card"><div class="metric-value">{len(comments)}</div><div class="metric-label">Comments Read</div></div>', unsafe_allow_html=True)
-                    with mc2:
-                        pc = "#22c55e" if pos_c >= 50 else "#fff"
-                        st.markdown(f'<div class="metric-card"><div class="metric-value" style="color:{pc};">{pos_c}%</div><div class="metric-label">Positive</div></div>', unsafe_allow_html=True)
-                    with mc3:
-                        nc = "#ef4444" if neg_c >= 30 else "#fff"
-                        st.markdown(f'<div class="metric-card"><div class="metric-value" style="color:{nc};">{neg_c}%</div><div class="metric-label">Negative</div></div>', unsafe_allow_html=True)
-                    with mc4:
-                        cc = "#22c55e" if confidence >= 70 else ("#eab308" if confidence >= 45 else "#ef4444")
-                        st.markdown(f'<div class="metric-card"><div class="metric-value" style="color:{cc};">{confidence}%</div><div class="metric-label">Confidence</div></div>', unsafe_allow_html=True)
-
-                    st.markdown("<br>", unsafe_allow_html=True)
-
-                    # Tabs
-                    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                        "📋 Analysis", "💬 Top Comments",
-                        "📈 Sentiment", "💡 Tips & Keywords", "📥 Export"
-                    ])
-
-                    # Tab 1 - Analysis
-                    with tab1:
-                        rec = result.get("recommendation", "")
-                        if rec:
-                            st.markdown(f"""
-                            <div style="background:#111;border:1px solid #222;border-left:3px solid #fff;
-                                border-radius:0 8px 8px 0;padding:1.1rem 1.4rem;margin-bottom:1.5rem;
-                                animation:fadeInUp 0.4s ease both;">
-                                <span style="font-size:0.68rem;color:#555;text-transform:uppercase;
-                                             letter-spacing:0.1em;font-weight:600;">Recommendation</span>
-                                <p style="color:#e5e5e5;font-size:0.93rem;margin:0.4rem 0 0 0;
-                                          line-height:1.65;font-weight:500;">{rec}</p>
-                            </div>""", unsafe_allow_html=True)
-
-                        st.markdown('<p class="section-header">Community Consensus</p>', unsafe_allow_html=True)
-                        summary = result.get("summary", "No summary.")
-                        st.markdown(
-                            f'<div class="glass-card"><p style="color:#aaa;font-size:0.92rem;line-height:1.75;margin:0;">{summary}</p></div>',
-                            unsafe_allow_html=True,
-                        )
-                        pcol, rcol = st.columns(2, gap="medium")
-                        with pcol:
-                            st.markdown('<p class="section-header">What''s Good</p>', unsafe_allow_html=True)
-                            for p in result.get("positive_aspects", []):
-                                st.markdown(f'<div class="pro-item">{p}</div>', unsafe_allow_html=True)
-                        with rcol:
-                            st.markdown('<p class="section-header">Red Flags</p>', unsafe_allow_html=True)
-                            flags = result.get("red_flags", [])
-                            if flags:
-                                for fl in flags:
-                                    st.markdown(f'<div class="red-flag-item">{fl}</div>', unsafe_allow_html=True)
-                            else:
-                                st.markdown('<div class="pro-item">No major red flags detected.</div>', unsafe_allow_html=True)
-                        version = result.get("version_concerns", "None")
-                        if version and version.lower() != "none":
-                            st.markdown('<p class="section-header" style="margin-top:1.2rem;">Compatibility Note</p>', unsafe_allow_html=True)
-                            st.markdown(f"""
-                            <div style="background:#161200;border:1px solid #2e2800;border-left:3px solid #eab308;
-                                border-radius:0 7px 7px 0;padding:0.85rem 1.1rem;">
-                                <p style="color:#ca8a04;font-size:0.88rem;margin:0;line-height:1.6;">{version}</p>
-                            </div>""", unsafe_allow_html=True)
-
-                    # Tab 2 - Top Comments
-                    with tab2:
-                        if show_top_comments:
-                            st.markdown('<p class="section-header">Top Liked Comments</p>', unsafe_allow_html=True)
-                            for i, c in enumerate(comments[:10]):
-                                likes_str = format_number(c["likes"]) if c["likes"] > 0 else "—"
-                                author    = c["author"]
-                                pub_at    = c["published_at"]
-                                text_raw  = c["text"]
-                                text_disp = text_raw[:320] + ("..." if len(text_raw) > 320 else "")
-                                st.markdown(f"""
-                                <div class="comment-card" style="animation-delay:{i * 0.05}s;">
-                                    <div style="display:flex;justify-content:space-between;align-items:center;">
-                                        <span class="comment-author">{author}</span>
-                                        <span class="comment-likes">{likes_str} likes · {pub_at}</span>
-                                    </div>
-                                    <p class="comment-text">{text_disp}</p>
-                                </div>""", unsafe_allow_html=True)
-                        else:
-                            st.info("Enable 'Top Liked Comments' in the sidebar.")
-
-                    # Tab 3 - Sentiment
-                    with tab3:
-                        if show_sentiment:
-                            st.markdown('<p class="section-header">Sentiment Breakdown</p>', unsafe_allow_html=True)
-                            pos = s_data.get("positive", 0)
-                            neu = s_data.get("neutral",  0)
-                            neg = s_data.get("negative", 0)
-                            for label, val, bar_c, txt_c in [
-                                ("Positive", pos, "#22c55e", "#4ade80"),
-                                ("Neutral",  neu, "#444",    "#888"),
-                                ("Negative", neg, "#ef4444", "#f87171"),
-                            ]:
-                                st.markdown(f"""
-                                <div style="margin-bottom:1.3rem;">
-                                    <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.4rem;">
-                                        <span style="color:#bbb;font-size:0.85rem;font-weight:500;">{label}</span>
-                                        <span style="color:{txt_c};font-weight:700;font-size:0.9rem;">{val}%</span>
-                                    </div>
-                                    <div style="background:#1a1a1a;border-radius:3px;height:6px;overflow:hidden;">
-                                        <div style="width:{val}%;height:100%;background:{bar_c};border-radius:3px;
-                                            animation:barGrow 0.8s ease both;"></div>
-                                    </div>
-                                </div>""", unsafe_allow_html=True)
-                            st.markdown("<br>", unsafe_allow_html=True)
-                            df = pd.DataFrame({
-                                "Sentiment":  ["Positive", "Neutral", "Negative"],
-                                "Percentage": [pos, neu, neg],
-                            })
-                            st.bar_chart(df.set_index("Sentiment"), color=["#ffffff"],
-                                         use_container_width=True, height=220)
-                        else:
-                            st.info("Enable 'Sentiment Breakdown' in the sidebar.")
-
-                    # Tab 4 - Tips & Keywords
-                    with tab4:
-                        if show_tips:
-                            tips = result.get("community_tips", [])
-                            if tips:
-                                st.markdown('<p class="section-header">From the Comment Section</p>', unsafe_allow_html=True)
-                                for tip in tips:
-                                    st.markdown(f"""
-                                    <div style="background:#111;border:1px solid #222;border-left:3px solid #2a2a2a;
-                                        border-radius:0 7px 7px 0;padding:0.8rem 1.1rem;margin-bottom:0.5rem;">
-                                        <p style="color:#aaa;font-size:0.88rem;margin:0;line-height:1.55;">{tip}</p>
-                                    </div>""", unsafe_allow_html=True)
-                        if show_keywords:
-                            keywords = result.get("top_keywords", [])
-                            if keywords:
-                                st.markdown('<p class="section-header" style="margin-top:1.3rem;">Keywords</p>', unsafe_allow_html=True)
-                                chips = "".join(
-                                    f'<span class="keyword-chip">{kw}</span>'
-                                    for kw in keywords
-                                )
-                                st.markdown(f'<div style="padding:0.3rem 0;">{chips}</div>', unsafe_allow_html=True)
-                        if not show_tips and not show_keywords:
-                            st.info("Enable tips/keywords in the sidebar.")
-
-                    # Tab 5 - Export
-                    with tab5:
-                        st.markdown('<p class="section-header">Download Report</p>', unsafe_allow_html=True)
-                        report_md = generate_report_markdown(
-                            video_meta, result, persona_description, len(comments)
-                        )
-                        ts = datetime.now().strftime("%Y%m%d_%H%M")
-                        st.download_button(
-                            label="Download Full Report (.md)",
-                            data=report_md,
-                            file_name=f"tubefit_{video_id}_{ts}.md",
-                            mime="text/markdown",
-                            use_container_width=True,
-                        )
-                        st.markdown("<br>", unsafe_allow_html=True)
-                        st.markdown('<p class="section-header">Raw JSON</p>', unsafe_allow_html=True)
-                        with st.expander("View Gemini response"):
-                            st.json(result)
-                        analysed_at = datetime.now().strftime("%b %d, %Y at %H:%M")
-                        cache_comments_label = "✓ hit" if comments_from_cache else "✗ miss"
-                        cache_analysis_label = "✓ hit" if analysis_from_cache else "✗ miss"
+            else:
+                st.info("Enable 'Top Liked Comments' in the sidebar.")
+
+        # Tab 3 - Sentiment
+        with tab3:
+            if show_sentiment:
+                st.markdown('<p class="section-header">Sentiment Breakdown</p>', unsafe_allow_html=True)
+                pos = s_data.get("positive", 0)
+                neu = s_data.get("neutral",  0)
+                neg = s_data.get("negative", 0)
+                for label, val, bar_c, txt_c in [
+                    ("Positive", pos, "#22c55e", "#4ade80"),
+                    ("Neutral",  neu, "#444",    "#888"),
+                    ("Negative", neg, "#ef4444", "#f87171"),
+                ]:
+                    st.markdown(f"""
+                    <div style="margin-bottom:1.3rem;">
+                        <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.4rem;">
+                            <span style="color:#bbb;font-size:0.85rem;font-weight:500;">{label}</span>
+                            <span style="color:{txt_c};font-weight:700;font-size:0.9rem;">{val}%</span>
+                        </div>
+                        <div style="background:#1a1a1a;border-radius:3px;height:6px;overflow:hidden;">
+                            <div style="width:{val}%;height:100%;background:{bar_c};border-radius:3px;
+                                animation:barGrow 0.8s ease both;"></div>
+                        </div>
+                    </div>""", unsafe_allow_html=True)
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.bar_chart(
+                    {"Percentage": {"Positive": pos, "Neutral": neu, "Negative": neg}},
+                    color=["#ffffff"], use_container_width=True, height=220,
+                )
+            else:
+                st.info("Enable 'Sentiment Breakdown' in the sidebar.")
+
+        # Tab 4 - Tips & Keywords
+        with tab4:
+            if show_tips:
+                tips = result.get("community_tips", [])
+                if tips:
+                    st.markdown('<p class="section-header">From the Comment Section</p>', unsafe_allow_html=True)
+                    for tip in tips:
                         st.markdown(f"""
-                        <div class="glass-card" style="margin-top:1rem;">
-                            <p style="color:#555;font-size:0.82rem;margin:0;line-height:1.9;">
-                                Video ID &nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{video_id}</span><br>
-                                Analysed &nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{analysed_at}</span><br>
-                                Comments &nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{len(comments)}</span><br>
-                                Persona &nbsp;&nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{selected_persona}</span><br>
-                                Cache (comments) &nbsp;·&nbsp; <span style="color:#888;">{cache_comments_label}</span><br>
-                                Cache (analysis) &nbsp;·&nbsp; <span style="color:#888;">{cache_analysis_label}</span>
-                            </p>
+                        <div style="background:#111;border:1px solid #222;border-left:3px solid #2a2a2a;
+                            border-radius:0 7px 7px 0;padding:0.8rem 1.1rem;margin-bottom:0.5rem;">
+                            <p style="color:#aaa;font-size:0.88rem;margin:0;line-height:1.55;">{tip}</p>
                         </div>""", unsafe_allow_html=True)
+            if show_keywords:
+                keywords = result.get("top_keywords", [])
+                if keywords:
+                    st.markdown('<p class="section-header" style="margin-top:1.3rem;">Keywords</p>', unsafe_allow_html=True)
+                    chips = "".join(
+                        f'<span class="keyword-chip">{kw}</span>'
+                        for kw in keywords
+                    )
+                    st.markdown(f'<div style="padding:0.3rem 0;">{chips}</div>', unsafe_allow_html=True)
+            if not show_tips and not show_keywords:
+                st.info("Enable tips/keywords in the sidebar.")
+
+        # Tab 5 - Export
+        with tab5:
+            st.markdown('<p class="section-header">Download Report</p>', unsafe_allow_html=True)
+            report_md = generate_report_markdown(
+                video_meta, result, job.persona, len(comments)
+            )
+            ts = datetime.now().strftime("%Y%m%d_%H%M")
+            st.download_button(
+                label="Download Full Report (.md)",
+                data=report_md,
+                file_name=f"tubefit_{video_id}_{ts}.md",
+                mime="text/markdown",
+                use_container_width=True,
+            )
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown('<p class="section-header">Raw JSON</p>', unsafe_allow_html=True)
+            with st.expander("View Gemini response"):
+                st.json(result)
+            analysed_at = datetime.fromtimestamp(job.finished_at).strftime("%b %d, %Y at %H:%M")
+            cache_comments_label = (
+                f"✓ hit ({format_age(comments_age)})" if comments_age is not None else "✗ miss"
+            )
+            cache_analysis_label = (
+                f"✓ hit ({format_age(analysis_age)})" if analysis_age is not None else "✗ miss"
+            )
+            st.markdown(f"""
+            <div class="glass-card" style="margin-top:1rem;">
+                <p style="color:#555;font-size:0.82rem;margin:0;line-height:1.9;">
+                    Video ID &nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{video_id}</span><br>
+                    Analysed &nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{analysed_at}</span><br>
+                    Comments &nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{len(comments)}</span><br>
+                    Persona &nbsp;&nbsp;&nbsp;&nbsp;·&nbsp; <span style="color:#888;">{persona_label}</span><br>
+                    Cache (comments) &nbsp;·&nbsp; <span style="color:#888;">{cache_comments_label}</span><br>
+                    Cache (analysis) &nbsp;·&nbsp; <span style="color:#888;">{cache_analysis_label}</span><br>
+                First content &nbsp;·&nbsp; <span style="color:#888;">{job.first_content_s or 0:.1f} s</span>
+                &nbsp;&nbsp;Total &nbsp;·&nbsp; <span style="color:#888;">{job.total_s or 0:.1f} s</span>
+                </p>
+            </div>""", unsafe_allow_html=True)
 
 # FOOTER
 st.markdown("<br>", unsafe_allow_html=True)
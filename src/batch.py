@@ -0,0 +1,206 @@
+"""
+Headless batch runner — score many videos (a playlist, a channel's
+uploads) against one or more personas without the Streamlit form.
+
+    python -m src.batch URL_OR_ID ... --persona "I'm a beginner ..." [--persona ...]
+    python -m src.batch -i urls.txt --persona "..." -o results.jsonl
+
+Metadata for every video is looked up first, 50 ids per videos.list call.
+Comment fetches and Gemini analyses then run on a bounded worker pool
+through the same cached pipeline as the app, so anything already in the
+cache costs no quota; all personas for a video share one Gemini request.
+Batch calls run at background priority, so a batch never starves users of
+the app sharing the same rate-limit budget.  One JSON line is written per (video, persona) as
+soon as it finishes, so results stream out in completion order.
+"""
+import re
+import sys
+import json
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
+
+from src.utils import extract_video_id
+from src.youtube_api import get_videos_metadata
+from src.cache import get_cached_metadata, set_cached_metadata
+from src.pipeline import fetch_video_data, analyse_video_personas
+from src.rate_limit import background_priority
+
+DEFAULT_WORKERS = 4
+
+_VIDEO_ID = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+
+def resolve_video_id(item: str) -> str | None:
+    """Accept a YouTube URL in any format extract_video_id knows, or a bare id."""
+    item = item.strip()
+    if _VIDEO_ID.fullmatch(item):
+        return item
+    return extract_video_id(item)
+
+
+def load_metadata(video_ids: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    (metadata, errors) for video_ids: cache hits first, the rest in
+    batched API calls; errors maps the ids whose lookup failed to why.
+    """
+    found   = {v: m for v in video_ids if (m := get_cached_metadata(v)) is not None}
+    missing = [v for v in video_ids if v not in found]
+    fetched, failed = get_videos_metadata(missing)
+    for video_id, meta in fetched.items():
+        set_cached_metadata(video_id, meta)
+        found[video_id] = meta
+    return found, failed
+
+
+def _background(fn, *args, **kwargs):
+    """Run fn behind the interactive app's API calls in the rate limiter."""
+    with background_priority():
+        return fn(*args, **kwargs)
+
+
+def _record(item: str, video_id: str | None, persona: str, **fields) -> dict:
+    return {"input": item, "video_id": video_id, "persona": persona, **fields}
+
+
+def run_batch(
+    items: Iterable[str],
+    personas: list[str],
+    max_comments: int = 100,
+    sort_order: str = "relevance",
+    workers: int = DEFAULT_WORKERS,
+) -> Iterator[dict]:
+    """
+    Yield one result dict per (video, persona) as each video's analyses
+    finish.
+    Every record has input, video_id and persona; successful ones add
+    title, comments, verdict, confidence_score, from_cache and the full
+    Gemini result, failed ones an error message instead.
+    """
+    videos: dict[str, str] = {}                 # video_id → first input naming it
+    for item in items:
+        video_id = resolve_video_id(item)
+        if video_id is None:
+            for persona in personas:
+                yield _record(item, None, persona, error="not a YouTube URL or video id")
+        else:
+            videos.setdefault(video_id, item)
+
+    with background_priority():
+        metadata, metadata_errors = load_metadata(list(videos))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tubefit-batch") as pool:
+        pending: dict[Future, tuple] = {}
+        for video_id, item in videos.items():
+            if video_id not in metadata:
+                error = metadata_errors.get(video_id, "video not found")
+                for persona in personas:
+                    yield _record(item, video_id, persona, error=error)
+                continue
+            future = pool.submit(
+                _background, fetch_video_data, video_id, max_comments, sort_order,
+                fetch_metadata=metadata.get,
+            )
+            pending[future] = ("fetch", video_id, item)
+
+        # Analyses are submitted from here as their comments arrive, so no
+        # pool task ever blocks on another one.
+        fetched: dict[str, dict] = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, video_id, item = pending.pop(future)
+                meta = metadata[video_id]
+                try:
+                    value = future.result()
+                except Exception as e:
+                    for p in personas:
+                        yield _record(item, video_id, p, title=meta["title"], error=str(e))
+                    continue
+
+                if stage == "fetch":
+                    fetched[video_id] = value
+                    if not value["comments"]:
+                        for p in personas:
+                            yield _record(
+                                item, video_id, p, title=meta["title"],
+                                error="no comments found or comments are disabled",
+                            )
+                        continue
+                    future = pool.submit(
+                        _background, analyse_video_personas,
+                        video_id, personas, value["comments"], value["comment_set"],
+                    )
+                    pending[future] = ("analyse", video_id, item)
+                    continue
+
+                comments = fetched[video_id]["comments"]
+                for persona, (result, age) in value.items():
+                    if not result:
+                        yield _record(
+                            item, video_id, persona, title=meta["title"],
+                            error="analysis failed",
+                        )
+                        continue
+                    yield _record(
+                        item, video_id, persona,
+                        title            = meta["title"],
+                        comments         = len(comments),
+                        verdict          = result.get("verdict"),
+                        confidence_score = result.get("confidence_score"),
+                        from_cache       = age is not None,
+                        result           = result,
+                    )
+
+
+def _read_items(path: str) -> list[str]:
+    """One URL / id per line; blank lines and # comments are skipped."""
+    if path == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.batch",
+        description="Analyse many YouTube videos for one or more personas; writes JSONL.",
+    )
+    parser.add_argument("videos", nargs="*", help="YouTube URLs or video ids")
+    parser.add_argument("-i", "--input", help="file with one URL / id per line ('-' for stdin)")
+    parser.add_argument(
+        "-p", "--persona", action="append", required=True,
+        help="persona description (repeat for several personas)",
+    )
+    parser.add_argument("-n", "--max-comments", type=int, default=100)
+    parser.add_argument("-s", "--sort", choices=("relevance", "time"), default="relevance")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    items = list(args.videos) + (_read_items(args.input) if args.input else [])
+    if not items:
+        parser.error("no videos given")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    try:
+        for record in run_batch(
+            items, args.persona,
+            max_comments=args.max_comments, sort_order=args.sort, workers=args.workers,
+        ):
+            failed += "error" in record
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,75 @@
 """
-Two-layer in-memory TTL cache for TubeFit.
+Two-layer TTL cache for TubeFit.
 
 Layer 1 — Comment Cache
-  key  : video_id
-  value: list of comment dicts
+  key  : video_id + sort order
+  value: superset of comment dicts in fetch order + next page token
+         (smaller requests are sliced, larger ones topped up)
   TTL  : COMMENT_TTL (default 3 h)
   saves: 1 YouTube Data API call per video
 
 Layer 2 — Analysis Cache
-  key  : video_id + SHA-256(persona_text)
+  key  : video_id + comment set (sort order, count) + SHA-256(persona_text)
   value: full Gemini JSON result dict
   TTL  : ANALYSIS_TTL (default 6 h)
   saves: 1 Gemini API call per (video, persona) pair
 
 Metadata (video title, stats, thumbnail) shares the comment TTL.
 
-The store is a plain module-level dict.  Because Python modules are
-imported once per server process, the dict survives across Streamlit
-reruns for every user in the same session.
+Map-reduce chunk results (large comment sets) are cached per persona +
+chunk contents under the analysis TTL, so only new chunks hit Gemini.
+
+The load_cached_* helpers add single-flight loading on top: when several
+sessions miss the same key at once, only the first one calls YouTube /
+Gemini and the rest wait for — and share — its result.  They return
+(value, age) so the UI can say how old a cached result is.
+
+Storage is pluggable (CACHE_BACKEND in secrets / env):
+
+  memory : module-level LRU dict (default).  Python modules are imported
+           once per server process, so the dict survives Streamlit reruns
+           for every user — but not a redeploy or worker restart.  It is
+           bounded by CACHE_MAX_ENTRIES and CACHE_MAX_BYTES; the least
+           recently used entries are evicted once either is exceeded.
+  sqlite : single SQLite file in WAL mode at CACHE_PATH.  Survives
+           restarts, so the hottest videos stay warm across deploys.
+  shared : small per-process LRU (L1) in front of the SQLite file (L2).
+           Every Streamlit worker on the host points at the same file, so
+           a video fetched or analysed by one worker is a hit for all of
+           them.  L1 copies are re-read from L2 after CACHE_L1_TTL seconds.
+
+Every entry has a soft and a hard TTL (stale-while-revalidate).  Up to
+the soft TTL (the TTLs above) it is a normal hit.  Between soft and
+HARD_TTL the stale value is still served instantly, and one background
+refresh per key brings it up to date — incrementally where possible:
+for newest-first sets only new comments are fetched, and the verdict is
+updated from the delta.  A verdict is also treated as stale as soon as
+the comments it is asked about differ from the ones it was built from,
+so a comment refresh is followed by a verdict refresh.  Only past the
+hard TTL does a request wait on YouTube / Gemini again.
+
+Expiry times are wall-clock (time.time) so that persisted entries keep
+their remaining TTL after a restart.  Expired entries are dropped lazily on
+read and by a background sweeper thread every CACHE_SWEEP_INTERVAL seconds,
+never by a full scan on the request path.
 """
+import os
+import json
 import time
+import sqlite3
 import hashlib
-from typing import Any
+import threading
+from typing import Any, Callable
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import (
+    CACHE_BACKEND, CACHE_PATH,
+    CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_SWEEP_INTERVAL,
+    CACHE_L1_MAX_ENTRIES, CACHE_L1_TTL, PERSONA_MATCH_THRESHOLD,
+)
+from src.personas import persona_guard, same_content_words, persona_vector, persona_similarity
+from src.rate_limit import background_priority, remaining_budget
 
 # ─────────────────────────────────────────────────────────
 # TTL constants (seconds)
@@ -29,12 +77,284 @@ from typing import Any
 COMMENT_TTL  = 3 * 60 * 60   # 3 hours
 ANALYSIS_TTL = 6 * 60 * 60   # 6 hours
 METADATA_TTL = 3 * 60 * 60   # 3 hours — same cadence as comments
+HARD_TTL     = 24 * 60 * 60  # stale entries are served (and refreshed) until this age
+
+# ─────────────────────────────────────────────────────────
+# Storage backends
+# Every backend stores entries shaped as
+# { sha256_key: {"ns": str, "data": <any>, "stored_at": float,
+#                "fresh_until": float, "expires_at": float, "size": int} }
+# and keeps per-namespace entry / byte counters up to date on every write,
+# so cache_stats() never has to scan the store.
+# ─────────────────────────────────────────────────────────
+def _approx_size(value: Any) -> int:
+    """Rough in-memory footprint of a cached value, in bytes."""
+    return len(json.dumps(value, default=str))
+
+
+class MemoryBackend:
+    """
+    Bounded LRU dict — fast, but lost when the process exits.
+    get/set/delete are O(1); the OrderedDict keeps recency order so the
+    oldest entry is always the first one evicted.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self._data: OrderedDict[str, dict] = OrderedDict()
+        self._lock        = threading.Lock()
+        self._max_entries = max_entries
+        self._max_bytes   = max_bytes
+        self._bytes       = 0
+        self._stats: dict[str, dict] = {}     # { ns: {"entries", "bytes", "evictions"} }
+
+    def _count(self, entry: dict, sign: int) -> None:
+        st = self._stats.setdefault(entry["ns"], {"entries": 0, "bytes": 0, "evictions": 0})
+        st["entries"] += sign
+        st["bytes"]   += sign * entry["size"]
+        self._bytes   += sign * entry["size"]
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: dict) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._count(old, -1)
+            self._data[key] = entry
+            self._count(entry, +1)
+            while self._data and (
+                len(self._data) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self._count(evicted, -1)
+                self._stats[evicted["ns"]]["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._count(old, -1)
+
+    def sweep(self, now: float) -> dict[str, int]:
+        """Drop every expired entry; return how many were removed per namespace."""
+        removed: dict[str, int] = {}
+        with self._lock:
+            expired = [k for k, v in self._data.items() if now > v["expires_at"]]
+            for k in expired:
+                entry = self._data.pop(k)
+                self._count(entry, -1)
+                removed[entry["ns"]] = removed.get(entry["ns"], 0) + 1
+        return removed
+
+    def ns_stats(self) -> dict[str, dict]:
+        with self._lock:
+            return {ns: dict(st) for ns, st in self._stats.items()}
+
+
+class SQLiteBackend:
+    """
+    Entries in a single SQLite file (WAL mode) so they survive restarts.
+    Values are stored as JSON text; one connection is kept per thread
+    because Streamlit serves every session from its own thread.
+    Per-namespace counts live in the ns_stats table, maintained by
+    triggers, so they stay exact across every process sharing the file.
+    """
+
+    _SCHEMA_VERSION = 3
+
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " key TEXT PRIMARY KEY,"
+        " ns TEXT NOT NULL,"
+        " data TEXT NOT NULL,"
+        " stored_at REAL NOT NULL,"
+        " fresh_until REAL NOT NULL,"
+        " expires_at REAL NOT NULL,"
+        " size INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)",
+        "CREATE TABLE IF NOT EXISTS ns_stats ("
+        " ns TEXT PRIMARY KEY,"
+        " entries INTEGER NOT NULL,"
+        " bytes INTEGER NOT NULL)",
+        "CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN"
+        " INSERT INTO ns_stats (ns, entries, bytes) VALUES (NEW.ns, 1, NEW.size)"
+        " ON CONFLICT(ns) DO UPDATE SET entries = entries + 1, bytes = bytes + NEW.size;"
+        " END",
+        "CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN"
+        " UPDATE ns_stats SET entries = entries - 1, bytes = bytes - OLD.size"
+        " WHERE ns = OLD.ns;"
+        " END",
+        "CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN"
+        " UPDATE ns_stats SET entries = entries - 1, bytes = bytes - OLD.size"
+        " WHERE ns = OLD.ns;"
+        " INSERT INTO ns_stats (ns, entries, bytes) VALUES (NEW.ns, 1, NEW.size)"
+        " ON CONFLICT(ns) DO UPDATE SET entries = entries + 1, bytes = bytes + NEW.size;"
+        " END",
+    )
+
+    def __init__(self, path: str) -> None:
+        self._path  = path
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._conn()
+        if conn.execute("PRAGMA user_version").fetchone()[0] != self._SCHEMA_VERSION:
+            # It is only a cache — on a schema change start from scratch.
+            conn.execute("DROP TABLE IF EXISTS entries")
+            conn.execute("DROP TABLE IF EXISTS ns_stats")
+            conn.execute(f"PRAGMA user_version = {self._SCHEMA_VERSION}")
+        for stmt in self._SCHEMA:
+            conn.execute(stmt)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> dict | None:
+        row = self._conn().execute(
+            "SELECT ns, data, stored_at, fresh_until, expires_at, size"
+            " FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "ns": row[0], "data": json.loads(row[1]), "stored_at": row[2],
+            "fresh_until": row[3], "expires_at": row[4], "size": row[5],
+        }
+
+    def set(self, key: str, entry: dict) -> None:
+        self._conn().execute(
+            "INSERT INTO entries (key, ns, data, stored_at, fresh_until, expires_at, size)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET ns = excluded.ns, data = excluded.data,"
+            " stored_at = excluded.stored_at, fresh_until = excluded.fresh_until,"
+            " expires_at = excluded.expires_at, size = excluded.size",
+            (
+                key, entry["ns"], json.dumps(entry["data"]), entry["stored_at"],
+                entry["fresh_until"], entry["expires_at"], entry["size"],
+            ),
+        )
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def sweep(self, now: float) -> dict[str, int]:
+        """Bulk-delete every expired row; return how many were removed per namespace."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            removed = dict(conn.execute(
+                "SELECT ns, COUNT(*) FROM entries WHERE expires_at < ? GROUP BY ns", (now,)
+            ).fetchall())
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def ns_stats(self) -> dict[str, dict]:
+        rows = self._conn().execute("SELECT ns, entries, bytes FROM ns_stats").fetchall()
+        return {ns: {"entries": n, "bytes": b, "evictions": 0} for ns, n, b in rows}
+
+
+class TieredBackend:
+    """
+    Process-local L1 in front of a shared L2.
+    Reads hit L1 while its copy is younger than l1_ttl, otherwise fall
+    through to L2 and refresh L1.  Writes and deletes go to both tiers.
+    """
+
+    def __init__(self, l1: MemoryBackend, l2: SQLiteBackend, l1_ttl: int) -> None:
+        self._l1     = l1
+        self._l2     = l2
+        self._l1_ttl = l1_ttl
+
+    def get(self, key: str) -> dict | None:
+        entry = self._l1.get(key)
+        if entry is not None and time.time() <= entry["l1_until"]:
+            return entry
+        entry = self._l2.get(key)
+        if entry is not None:
+            self._l1.set(key, {**entry, "l1_until": time.time() + self._l1_ttl})
+        return entry
+
+    def set(self, key: str, entry: dict) -> None:
+        self._l2.set(key, entry)
+        self._l1.set(key, {**entry, "l1_until": time.time() + self._l1_ttl})
+
+    def delete(self, key: str) -> None:
+        self._l1.delete(key)
+        self._l2.delete(key)
+
+    def sweep(self, now: float) -> dict[str, int]:
+        self._l1.sweep(now)
+        return self._l2.sweep(now)
+
+    def ns_stats(self) -> dict[str, dict]:
+        """Entry / byte counts of the shared store, evictions of the local L1."""
+        stats = self._l2.ns_stats()
+        for ns, st in self._l1.ns_stats().items():
+            stats.setdefault(ns, {"entries": 0, "bytes": 0, "evictions": 0})
+            stats[ns]["evictions"] = st["evictions"]
+        return stats
+
+
+def _make_backend(kind: str):
+    if kind == "shared":
+        return TieredBackend(
+            MemoryBackend(CACHE_L1_MAX_ENTRIES, CACHE_MAX_BYTES),
+            SQLiteBackend(CACHE_PATH),
+            CACHE_L1_TTL,
+        )
+    if kind == "sqlite":
+        return SQLiteBackend(CACHE_PATH)
+    if kind == "memory":
+        return MemoryBackend(CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+    raise ValueError(
+        f"Unknown CACHE_BACKEND {kind!r} (expected 'memory', 'sqlite' or 'shared')"
+    )
+
 
 # ─────────────────────────────────────────────────────────
 # Internal store
-# { sha256_key: {"data": <any>, "expires_at": float} }
 # ─────────────────────────────────────────────────────────
-_store: dict[str, dict] = {}
+_store = _make_backend(CACHE_BACKEND)
+_sweeper: threading.Thread | None = None
+_sweeper_lock = threading.Lock()
+
+# Per-namespace request counters, kept by this process
+# { ns: {"hits": int, "misses": int, "stale": int, "expired": int} }
+_NAMESPACES = ("comments", "metadata", "analysis")
+_counters: dict[str, dict] = {}
+_counters_lock = threading.Lock()
+
+# In-flight loads for single-flight deduplication
+# { sha256_key: {"done": Event, "value": <any>, "error": Exception | None} }
+_inflight: dict[str, dict] = {}
+_inflight_lock = threading.Lock()
+
+# Custom persona lookups: exact key hits, similar-persona hits, misses
+_custom_counters = {"exact": 0, "similar": 0, "misses": 0}
+
+# Per-video index of analysed personas, for similar custom persona lookups
+_PERSONA_INDEX_MAX = 50
+_persona_index_lock = threading.Lock()
+
+# Background stale-while-revalidate refreshes, at most one queued per key
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tubefit-refresh")
+_refreshing: set[str] = set()
+_refreshing_lock = threading.Lock()
 
 
 # ─────────────────────────────────────────────────────────
@@ -46,78 +366,505 @@ def _make_key(*parts: str) -> str:
     return hashlib.sha256(raw.encode()).hexdigest()
 
 
-def _set(key: str, value: Any, ttl: int) -> None:
-    _store[key] = {
+def _sweep_forever() -> None:
+    while True:
+        time.sleep(CACHE_SWEEP_INTERVAL)
+        try:
+            _evict_expired()
+        except Exception:
+            pass                      # never let the sweeper thread die
+
+
+def _ensure_sweeper() -> None:
+    """Start the background expiry sweeper once per process."""
+    global _sweeper
+    if _sweeper is not None:
+        return
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(
+                target=_sweep_forever, name="tubefit-cache-sweeper", daemon=True,
+            )
+            _sweeper.start()
+
+
+def _bump(ns: str, counter: str, n: int = 1) -> None:
+    with _counters_lock:
+        st = _counters.setdefault(ns, {"hits": 0, "misses": 0, "stale": 0, "expired": 0})
+        st[counter] += n
+
+
+def _set(ns: str, key: str, value: Any, ttl: int, hard_ttl: int = 0) -> None:
+    """Store value, fresh for ttl seconds and servable stale until hard_ttl."""
+    _ensure_sweeper()
+    now = time.time()
+    _store.set(key, {
+        "ns": ns,
         "data": value,
-        "expires_at": time.monotonic() + ttl,
-    }
+        "stored_at": now,
+        "fresh_until": now + ttl,
+        "expires_at": now + max(ttl, hard_ttl),
+        "size": _approx_size(value),
+    })
 
 
-def _get(key: str) -> Any | None:
+def _lookup(
+    ns: str, key: str, current: Callable[[Any], bool] | None = None,
+) -> tuple[Any, float] | None:
+    """
+    Return (value, age_seconds) while the entry is fresh; stale or missing
+    counts as a miss.  A fresh value that current() rejects — it was built
+    from inputs that have since changed — counts as stale.
+    """
     entry = _store.get(key)
     if entry is None:
+        _bump(ns, "misses")
         return None
-    if time.monotonic() > entry["expires_at"]:
-        del _store[key]               # lazy eviction on read
+    now = time.time()
+    if now > entry["expires_at"]:
+        _store.delete(key)            # lazy eviction on read
+        _bump(ns, "expired")
+        _bump(ns, "misses")
         return None
-    return entry["data"]
+    if now > entry["fresh_until"] or (current is not None and not current(entry["data"])):
+        _bump(ns, "misses")
+        return None
+    _bump(ns, "hits")
+    return entry["data"], now - entry["stored_at"]
+
+
+def _get(ns: str, key: str) -> Any | None:
+    hit = _lookup(ns, key)
+    return hit[0] if hit else None
+
+
+def _fresh(key: str) -> tuple[Any, float] | None:
+    """Like _lookup, but without touching the hit / miss counters."""
+    entry = _store.get(key)
+    if entry is None or time.time() > entry["fresh_until"]:
+        return None
+    return entry["data"], time.time() - entry["stored_at"]
+
+
+def _get_stale(key: str) -> tuple[Any, float] | None:
+    """Return (value, age_seconds) for any entry before its hard TTL, fresh or not."""
+    entry = _store.get(key)
+    if entry is None or time.time() > entry["expires_at"]:
+        return None
+    return entry["data"], time.time() - entry["stored_at"]
 
 
 def _evict_expired() -> int:
     """Remove all expired entries; return how many were removed."""
-    now     = time.monotonic()
-    expired = [k for k, v in _store.items() if now > v["expires_at"]]
-    for k in expired:
-        del _store[k]
-    return len(expired)
+    removed = _store.sweep(time.time())
+    for ns, n in removed.items():
+        _bump(ns, "expired", n)
+    return sum(removed.values())
+
+
+def _single_flight(key: str, fn: Callable[[], Any]) -> tuple[Any, bool]:
+    """
+    Run fn() at most once per process for concurrent callers of key.
+    Returns (value, shared); shared is True for callers that waited on
+    another caller's in-flight run instead of running fn themselves.
+    """
+    with _inflight_lock:
+        call   = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = {"done": threading.Event(), "value": None, "error": None}
+
+    if not leader:
+        call["done"].wait()
+        if call["error"] is not None:
+            raise call["error"]
+        return call["value"], True
+
+    try:
+        call["value"] = fn()
+        return call["value"], False
+    except Exception as e:
+        call["error"] = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        call["done"].set()
+
+
+def _revalidate(key: str, fn: Callable[[], Any]) -> None:
+    """Run fn() on the refresh pool unless a refresh of key is already queued."""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    def job() -> None:
+        try:
+            with background_priority():
+                _single_flight(key, fn)
+        except Exception:
+            pass                      # the stale copy keeps being served
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _refresh_pool.submit(job)
+
+
+def _load(
+    ns: str,
+    key: str,
+    ttl: int,
+    loader: Callable[[], Any],
+    hard_ttl: int = 0,
+    store: Callable[[Any], None] | None = None,
+    fallback: Callable[[], tuple[Any, float] | None] | None = None,
+    current: Callable[[Any], bool] | None = None,
+) -> tuple[Any, float | None]:
+    """
+    Return (value, age) for key; age is seconds since the value was
+    cached, or None if this call just loaded it.
+
+      fresh          → served as is (if current() accepts it; else stale)
+      stale (≤ hard) → served as is, loader() re-run once in the background
+      fallback()     → its (value, age), if it finds a stand-in
+      missing        → loader() run at most once per process for concurrent
+                       misses; callers that wait on it get age 0
+
+    Falsy loader results are returned but not cached.
+    """
+    hit = _lookup(ns, key, current)
+    if hit is not None:
+        return hit
+
+    def run() -> tuple[Any, float | None]:
+        fresh = _fresh(key)           # a previous leader may have just finished
+        if fresh is not None and (current is None or current(fresh[0])):
+            return fresh
+        value = loader()
+        if value:
+            if store is not None:
+                store(value)
+            else:
+                _set(ns, key, value, ttl, hard_ttl)
+        return value, None
+
+    stale = _get_stale(key) if hard_ttl else None
+    if stale is not None:
+        _bump(ns, "stale")
+        _revalidate(key, run)
+        return stale
+
+    found = fallback() if fallback is not None else None
+    if found is not None:
+        return found
+
+    (value, age), shared = _single_flight(key, run)
+    return value, (0.0 if shared and age is None else age)
 
 
 # ─────────────────────────────────────────────────────────
 # Public API — Layer 1: Comments
+# One superset per (video, sort order), kept in API fetch order:
+# { "comments": [comment dicts], "next_page_token": str | None }
+# A token of None means the video has no more comments to fetch.
+# Stale supersets are served while refresh() brings them up to date.
 # ─────────────────────────────────────────────────────────
-def get_cached_comments(video_id: str) -> list | None:
-    return _get(_make_key("comments", video_id))
+def _covers(entry: dict, max_comments: int) -> bool:
+    return len(entry["comments"]) >= max_comments or entry["next_page_token"] is None
+
+
+def _slice(entry: dict, max_comments: int) -> list:
+    """First max_comments in fetch order, sorted by likes like a fresh fetch."""
+    return sorted(entry["comments"][:max_comments], key=lambda c: c["likes"], reverse=True)
+
+
+def get_cached_comments(video_id: str, max_comments: int, sort_order: str) -> list | None:
+    entry = _get("comments", _make_key("comments", video_id, sort_order))
+    if entry is None or not _covers(entry, max_comments):
+        return None
+    return _slice(entry, max_comments)
+
 
+def set_cached_comments(
+    video_id: str, sort_order: str, comments: list, next_page_token: str | None,
+) -> None:
+    _set(
+        "comments", _make_key("comments", video_id, sort_order),
+        {"comments": comments, "next_page_token": next_page_token},
+        COMMENT_TTL, HARD_TTL,
+    )
 
-def set_cached_comments(video_id: str, comments: list) -> None:
-    _set(_make_key("comments", video_id), comments, COMMENT_TTL)
+
+def load_cached_comments(
+    video_id: str,
+    max_comments: int,
+    sort_order: str,
+    fetch: Callable[[int, str | None], tuple[list, str | None]],
+    refresh: Callable[[dict], dict | None] | None = None,
+) -> tuple[list, float | None]:
+    """
+    Return (comments, age) for the top max_comments by sort_order; age is
+    None when comments had to be fetched.
+    A cached superset at least that large is sliced with no API call; a
+    smaller one is topped up by fetch(missing_count, saved_page_token),
+    which only pulls the comments not yet cached (any it returns again are
+    dropped).  A stale superset is
+    served immediately while refresh() — which returns it updated with
+    just the new comments, or None to refetch in full — runs in the
+    background.
+    """
+    key = _make_key("comments", video_id, sort_order)
+    hit = _lookup("comments", key)
+    if hit is not None and _covers(hit[0], max_comments):
+        return _slice(hit[0], max_comments), hit[1]
+
+    def brought_up_to_date(stale: dict | None) -> dict | None:
+        entry = refresh(stale) if stale and refresh is not None else None
+        if entry is None and stale:
+            new, token = fetch(len(stale["comments"]), None)
+            entry = {"comments": new, "next_page_token": token} if new else None
+        if entry:
+            _set("comments", key, entry, COMMENT_TTL, HARD_TTL)
+        return entry
+
+    stale = _get_stale(key) if hit is None else None
+    if stale is not None and _covers(stale[0], max_comments):
+        _bump("comments", "stale")
+        _revalidate(key, lambda: brought_up_to_date(stale[0]))
+        return _slice(stale[0], max_comments), stale[1]
+
+    def run() -> tuple[list, float | None]:
+        fresh = _fresh(key)
+        entry, age = fresh if fresh is not None else (None, None)
+        if entry is None:
+            stale = _get_stale(key)
+            entry = brought_up_to_date(stale[0]) if stale else None
+        entry = entry or {"comments": [], "next_page_token": None}
+        if entry["comments"] and _covers(entry, max_comments):
+            return _slice(entry, max_comments), age
+        have  = entry["comments"]
+        token = entry["next_page_token"] if have else None
+        new, token = fetch(max_comments - len(have), token)
+        known = {c.get("id") or c["text"] for c in have}
+        new   = [c for c in new if (c.get("id") or c["text"]) not in known]
+        merged = {"comments": have + new, "next_page_token": token}
+        latest = _fresh(key)
+        if new and (latest is None or len(latest[0]["comments"]) <= len(merged["comments"])):
+            _set("comments", key, merged, COMMENT_TTL, HARD_TTL)
+        return _slice(merged, max_comments), None
+
+    inflight_key = _make_key("comments", video_id, sort_order, str(max_comments))
+    (comments, age), shared = _single_flight(inflight_key, run)
+    return comments, (0.0 if shared and age is None else age)
 
 
 # ─────────────────────────────────────────────────────────
 # Public API — Layer 1: Metadata
 # ─────────────────────────────────────────────────────────
 def get_cached_metadata(video_id: str) -> dict | None:
-    return _get(_make_key("metadata", video_id))
+    return _get("metadata", _make_key("metadata", video_id))
 
 
 def set_cached_metadata(video_id: str, metadata: dict) -> None:
-    _set(_make_key("metadata", video_id), metadata, METADATA_TTL)
+    _set("metadata", _make_key("metadata", video_id), metadata, METADATA_TTL, HARD_TTL)
+
+
+def load_cached_metadata(
+    video_id: str, loader: Callable[[], dict | None]
+) -> tuple[dict | None, float | None]:
+    return _load(
+        "metadata", _make_key("metadata", video_id), METADATA_TTL, loader, HARD_TTL,
+    )
 
 
 # ─────────────────────────────────────────────────────────
-# Public API — Layer 2: AI Analysis (per video + persona)
+# Public API — Layer 2: AI Analysis (per video + comment set + persona)
+# comment_set identifies the comments the verdict was built from
+# (e.g. "relevance:75"), so a 25-comment analysis never answers a
+# 100-comment request.  Each analysis also records its basis — the ids
+# of the comments it saw — so an expired verdict can be updated from the
+# comments added since, rather than recomputed.  A per-video index of the
+# persona texts analysed lets a free-form persona reuse the verdict of a
+# near-identical one.
 # ─────────────────────────────────────────────────────────
-def get_cached_analysis(video_id: str, persona: str) -> dict | None:
-    return _get(_make_key("analysis", video_id, persona))
+def get_cached_analysis(video_id: str, persona: str, comment_set: str = "") -> dict | None:
+    return _get("analysis", _make_key("analysis", video_id, comment_set, persona))
+
+
+def set_cached_analysis(
+    video_id: str, persona: str, result: dict, comment_set: str = "",
+    basis: list[str] | None = None,
+) -> None:
+    _set(
+        "analysis", _make_key("analysis", video_id, comment_set, persona),
+        result, ANALYSIS_TTL, HARD_TTL,
+    )
+    if basis is not None:
+        _set(
+            "basis", _make_key("basis", video_id, comment_set, persona),
+            basis, ANALYSIS_TTL, HARD_TTL,
+        )
+    _index_persona(video_id, comment_set, persona)
+
+
+def _index_persona(video_id: str, comment_set: str, persona: str) -> None:
+    """Record persona in the video's index of analysed personas (newest last)."""
+    key = _make_key("personas", video_id, comment_set)
+    with _persona_index_lock:
+        found    = _get_stale(key)
+        personas = [p for p in (found[0] if found else []) if p != persona]
+        personas = (personas + [persona])[-_PERSONA_INDEX_MAX:]
+        _set("personas", key, personas, ANALYSIS_TTL, HARD_TTL)
+
+
+def _similar_analysis(
+    video_id: str, persona: str, comment_set: str,
+) -> tuple[dict, float, str] | None:
+    """
+    Fresh analysis of the indexed persona most similar to persona, if it
+    names the same versions and negations (persona_guard), uses the same
+    content words up to spelling (same_content_words) and clears
+    PERSONA_MATCH_THRESHOLD; returns (result, age, matched persona).
+    """
+    found = _get_stale(_make_key("personas", video_id, comment_set))
+    if found is None or PERSONA_MATCH_THRESHOLD > 1:
+        return None
+    guard  = persona_guard(persona)
+    target = persona_vector(persona)
+    scored = sorted(
+        (
+            (persona_similarity(target, persona_vector(p)), p)
+            for p in found[0]
+            if p != persona and persona_guard(p) == guard and same_content_words(persona, p)
+        ),
+        reverse=True,
+    )
+    for score, candidate in scored:
+        if score < PERSONA_MATCH_THRESHOLD:
+            break
+        hit = _fresh(_make_key("analysis", video_id, comment_set, candidate))
+        if hit is not None:
+            return hit[0], hit[1], candidate
+    return None
 
 
-def set_cached_analysis(video_id: str, persona: str, result: dict) -> None:
-    _set(_make_key("analysis", video_id, persona), result, ANALYSIS_TTL)
+def get_stale_analysis(
+    video_id: str, persona: str, comment_set: str = "",
+) -> tuple[dict, list[str]] | None:
+    """Return (result, basis) for an analysis before its hard TTL, even if stale."""
+    stale = _get_stale(_make_key("analysis", video_id, comment_set, persona))
+    basis = _get_stale(_make_key("basis", video_id, comment_set, persona))
+    if stale is None or basis is None:
+        return None
+    return stale[0], basis[0]
+
+
+def load_cached_analysis(
+    video_id: str, persona: str, loader: Callable[[], dict | None], comment_set: str = "",
+    basis: list[str] | None = None, custom: bool = False,
+    on_match: Callable[[str], None] | None = None,
+) -> tuple[dict | None, float | None]:
+    """
+    Load-through analysis lookup.  With basis (the refs of the comments
+    being analysed), a fresh verdict built from a different comment list
+    is served as stale and refreshed, so comments that arrived since reach
+    the verdict instead of waiting out ANALYSIS_TTL.  For free-form
+    (custom) personas a miss on the exact text falls back to the most
+    similar persona already analysed for this comment set (see
+    _similar_analysis); on_match(matched persona) is then called so the
+    caller can say whose verdict it is showing.
+    """
+    store = lambda result: set_cached_analysis(video_id, persona, result, comment_set, basis)
+    key   = _make_key("analysis", video_id, comment_set, persona)
+
+    def current(_result: dict) -> bool:
+        if basis is None:
+            return True
+        stored = _get_stale(_make_key("basis", video_id, comment_set, persona))
+        return stored is None or set(stored[0]) == set(basis)
+
+    if not custom:
+        return _load("analysis", key, ANALYSIS_TTL, loader, HARD_TTL, store, current=current)
+
+    similar = []
+    def fallback() -> tuple[dict, float] | None:
+        found = _similar_analysis(video_id, persona, comment_set)
+        similar.append(found is not None)
+        if found is None:
+            return None
+        result, age, matched = found
+        if on_match is not None:
+            on_match(matched)
+        return result, age
+
+    value, age = _load(
+        "analysis", key, ANALYSIS_TTL, loader, HARD_TTL, store, fallback, current,
+    )
+    outcome = "misses" if age is None else "similar" if any(similar) else "exact"
+    with _counters_lock:
+        _custom_counters[outcome] += 1
+    return value, age
+
+
+# ─────────────────────────────────────────────────────────
+# Public API — Layer 2: Map-reduce chunk analyses
+# Keyed on the chunk's comment texts, not the video, so an unchanged
+# chunk is a hit however the rest of the comment set has grown.
+# ─────────────────────────────────────────────────────────
+def load_cached_chunk_analysis(
+    persona: str, texts: list[str], loader: Callable[[], dict | None],
+) -> tuple[dict | None, float | None]:
+    return _load("chunk", _make_key("chunk", persona, *texts), ANALYSIS_TTL, loader)
 
 
 # ─────────────────────────────────────────────────────────
 # Stats (shown in sidebar)
 # ─────────────────────────────────────────────────────────
 def cache_stats() -> dict:
-    """Return live statistics without mutating the store."""
-    _evict_expired()                  # clean up before reporting
-    now     = time.monotonic()
-    comment_hits  = sum(1 for k in _store if _make_key("comments",  "")[:8] == k[:8])
-    metadata_hits = sum(1 for k in _store if _make_key("metadata",  "")[:8] == k[:8])
-    analysis_hits = sum(1 for k in _store if _make_key("analysis",  "")[:8] == k[:8])
+    """
+    Return live statistics in O(1): every figure comes from counters that
+    the store and _get/_set keep up to date, so no key is hashed or scanned.
+    Entries past their TTL but not yet swept are still counted.  "budget"
+    is the upstream API budget left in the rate limiter's buckets.
+    """
+    stored = _store.ns_stats()
+    with _counters_lock:
+        counters = {ns: dict(st) for ns, st in _counters.items()}
+        custom   = dict(_custom_counters)
+    lookups = sum(custom.values())
+    custom["hit_rate"] = (custom["exact"] + custom["similar"]) / lookups if lookups else 0.0
+
+    namespaces = {}
+    for ns in sorted(set(_NAMESPACES) | stored.keys() | counters.keys()):
+        namespaces[ns] = {
+            "entries"  : 0,
+            "bytes"    : 0,
+            "evictions": 0,
+            "hits"     : 0,
+            "misses"   : 0,
+            "stale"    : 0,
+            "expired"  : 0,
+            **stored.get(ns, {}),
+            **counters.get(ns, {}),
+        }
+
+    def total(field: str) -> int:
+        return sum(st[field] for st in namespaces.values())
+
     return {
-        "total"   : len(_store),
-        "comments": comment_hits,
-        "metadata": metadata_hits,
-        "analysis": analysis_hits,
+        "total"     : total("entries"),
+        "comments"  : namespaces["comments"]["entries"],
+        "metadata"  : namespaces["metadata"]["entries"],
+        "analysis"  : namespaces["analysis"]["entries"],
+        "bytes"     : total("bytes"),
+        "evictions" : total("evictions"),
+        "expired"   : total("expired"),
+        "hits"      : total("hits"),
+        "misses"    : total("misses"),
+        "stale"     : total("stale"),
+        "custom"    : custom,
+        "budget"    : remaining_budget(),
+        "namespaces": namespaces,
     }
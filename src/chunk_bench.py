@@ -0,0 +1,91 @@
+"""
+Chunk reuse benchmark for map-reduce analysis — how many chunk cache keys
+survive when a large comment set changes between refreshes.
+
+    python -m src.chunk_bench [-n 500] [-d 10]
+
+A reproducible set of -n distinct comments (ids, dates, 5–60 words each)
+is chunked, changed, and chunked again.  A chunk is reused when the same
+comment texts make up a chunk both times — the chunk cache key.
+
+  grow   : -d newer comments appended, nothing lost
+  window : -d newer comments in, the -d oldest out — a time-sorted
+           refresh of the app's fixed-size fetch window
+  churn  : -d comments anywhere in the set swapped for new ones — a
+           relevance refetch
+
+Exits 1 unless grow and window each reuse at least --min-reuse of the
+chunks they produce.
+"""
+import sys
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from src.map_reduce import chunk_comments
+
+_WORDS = """
+    python install error works great thanks video version mac windows linux
+    gpu cuda tutorial step code broken fixed pip package import module
+    beginner explained clearly fast slow skip missing updated outdated docs
+    environment path terminal editor debug run test build deploy server
+""".split()
+_START = datetime(2024, 1, 1)
+
+
+def _comment(i: int, rng: random.Random) -> dict:
+    text = " ".join(rng.choices(_WORDS, k=rng.randint(5, 60))) + f" #{i}"
+    published = (_START + timedelta(hours=6 * i)).date().isoformat()   # four a day, as the API dates them
+    return {"id": f"c{i:06d}", "text": text, "likes": 0, "published_at": published}
+
+
+def _keys(comments: list[dict]) -> set[tuple[str, ...]]:
+    return {tuple(c["text"] for c in chunk) for chunk in chunk_comments(comments)}
+
+
+def run(size: int = 500, delta: int = 10, seed: int = 0) -> list[dict]:
+    rng  = random.Random(seed)
+    base = [_comment(i, rng) for i in range(size)]
+    new  = [_comment(size + i, rng) for i in range(delta)]
+    swapped = set(rng.sample(range(size), delta))
+
+    before    = _keys(base)
+    scenarios = {
+        "grow"  : base + new,
+        "window": base[delta:] + new,
+        "churn" : [c for i, c in enumerate(base) if i not in swapped] + new,
+    }
+    rows = []
+    for name, changed in scenarios.items():
+        after  = _keys(changed)
+        reused = len(after & before)
+        rows.append({
+            "scenario"  : name,
+            "chunks"    : len(after),
+            "reused"    : reused,
+            "reuse_pct" : round(100 * reused / len(after), 1),
+        })
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.chunk_bench",
+        description="Map-reduce chunk cache reuse when a comment set changes.",
+    )
+    parser.add_argument("-n", "--comments", type=int, default=500)
+    parser.add_argument("-d", "--delta", type=int, default=10, help="comments added / dropped / swapped")
+    parser.add_argument("--min-reuse", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    rows = run(args.comments, args.delta)
+    for row in rows:
+        print(json.dumps(row))
+    return 0 if all(
+        r["reused"] >= args.min_reuse * r["chunks"] for r in rows if r["scenario"] != "churn"
+    ) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Comment pre-filter — removes noise before comments reach the Gemini prompt.
+
+Two passes, both linear in the number of comments:
+
+  1. Low-signal heuristics drop "first!"-style comments, emoji- or
+     punctuation-only replies, bare timestamps and link spam.
+  2. Near-duplicate collapse groups copy-pasted and lightly edited texts
+     using MinHash signatures over word shingles with banded (LSH)
+     bucketing.  Each group is replaced by its most-liked comment, with
+     the group's summed likes and a "duplicates" count.
+
+Hashes come from zlib.crc32 rather than hash(), so the same input always
+collapses the same way in every process.
+
+filter_comments returns a FilteredComments list, and filtering one again
+returns it unchanged: the pipeline filters once and hands the result to
+the budget check, selection and chunking without re-running the MinHash
+pass in each.
+"""
+import re
+import zlib
+
+# Near-duplicate detection
+_JACCARD_THRESHOLD = 0.8
+_BANDS = 6
+_ROWS  = 2                            # MinHash values per band
+_MASK32 = 0xFFFFFFFF
+_PERMUTATIONS = [                     # odd multiplier → bijection on 32-bit ints
+    (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+    for i in range(_BANDS * _ROWS)
+]
+
+# Low-signal heuristics
+_MIN_WORD_CHARS = 4
+_WORD      = re.compile(r"\w+")
+_TIMESTAMP = re.compile(r"^(\s*\d{1,2}:\d{2}(:\d{2})?\s*[-–—:]?\s*)+$")
+_FIRST     = re.compile(r"^(first|1st|early|who('?s| is) (here|watching)\b.*)\W*$", re.IGNORECASE)
+_LINK_SPAM = re.compile(
+    r"(https?://|www\.)\S+.*\b(sub(scribe)?|check (out )?my|follow me|whatsapp|telegram)\b"
+    r"|\b(sub(scribe)?|check (out )?my|follow me|whatsapp|telegram)\b.*(https?://|www\.)\S+",
+    re.IGNORECASE,
+)
+
+
+def is_low_signal(text: str) -> bool:
+    """True for comments that carry no opinion worth sending to Gemini."""
+    text = text.strip()
+    if sum(len(w) for w in _WORD.findall(text)) < _MIN_WORD_CHARS:
+        return True                   # empty, emoji-only, "??", "lol"
+    return bool(
+        _TIMESTAMP.match(text) or _FIRST.match(text) or _LINK_SPAM.search(text)
+    )
+
+
+def _shingles(text: str) -> set[bytes]:
+    words = _WORD.findall(text.lower())
+    if len(words) < 3:
+        return {w.encode() for w in words}
+    return {f"{a} {b}".encode() for a, b in zip(words, words[1:])}
+
+
+def _signature(shingles: frozenset[bytes]) -> list[int]:
+    hashes = [zlib.crc32(s) for s in shingles]
+    return [min((a * h + b) & _MASK32 for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b)
+
+
+def collapse_near_duplicates(comments: list[dict]) -> list[dict]:
+    """
+    Group comments whose shingle sets have Jaccard ≥ 0.8 and return one
+    comment per group (the most-liked), with summed likes and the number
+    of collapsed copies in "duplicates".  Order of first appearance is kept.
+    """
+    groups: list[dict] = []           # {"shingles", "members"}
+    buckets: dict[tuple, list[int]] = {}
+    exact: dict[frozenset, int] = {}  # verbatim copies skip the MinHash work
+
+    for c in comments:
+        shingles = frozenset(_shingles(c.get("text", "")))
+        if not shingles:
+            continue
+        if shingles in exact:
+            groups[exact[shingles]]["members"].append(c)
+            continue
+        sig   = _signature(shingles)
+        bands = [(i, tuple(sig[i * _ROWS:(i + 1) * _ROWS])) for i in range(_BANDS)]
+
+        match = None
+        seen  = set()
+        for band in bands:
+            for g in buckets.get(band, ()):
+                if g in seen:
+                    continue
+                seen.add(g)
+                if _jaccard(shingles, groups[g]["shingles"]) >= _JACCARD_THRESHOLD:
+                    match = g
+                    break
+            if match is not None:
+                break
+
+        if match is None:
+            match = len(groups)
+            groups.append({"shingles": shingles, "members": []})
+            for band in bands:
+                buckets.setdefault(band, []).append(match)
+        exact[shingles] = match
+        groups[match]["members"].append(c)
+
+    collapsed = []
+    for g in groups:
+        members = g["members"]
+        best    = max(members, key=lambda c: c.get("likes", 0))
+        collapsed.append({
+            **best,
+            "likes": sum(c.get("likes", 0) for c in members),
+            "duplicates": len(members) - 1,
+        })
+    return collapsed
+
+
+class FilteredComments(list):
+    """Comments filter_comments has already produced."""
+
+
+def filter_comments(comments: list[dict]) -> FilteredComments:
+    """Drop low-signal comments, then collapse near-duplicates (once)."""
+    if isinstance(comments, FilteredComments):
+        return comments
+    return FilteredComments(collapse_near_duplicates(
+        [c for c in comments if not is_low_signal(c.get("text", ""))]
+    ))
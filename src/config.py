@@ -1,18 +1,107 @@
 """
 Centralised config — reads API keys from Streamlit secrets (Cloud / local
 .streamlit/secrets.toml) with a fallback to environment variables.
+
+Streamlit is never imported here.  Inside the app (streamlit already
+loaded) st.secrets is used; headless runs — the batch CLI, workers — read
+.streamlit/secrets.toml directly, so both see the same settings.
 """
 import os
-import streamlit as st
+import sys
+
+try:
+    import tomllib
+except ImportError:                   # Python < 3.11 — environment only
+    tomllib = None
+
+_SECRETS_FILE = os.path.join(".streamlit", "secrets.toml")
 
 
-def _get_secret(key: str) -> str:
+def _file_secrets() -> dict:
+    if tomllib is None or not os.path.exists(_SECRETS_FILE):
+        return {}
     try:
-        return st.secrets[key]
-    except (KeyError, FileNotFoundError):
-        val = os.getenv(key, "")
-        return val
+        with open(_SECRETS_FILE, "rb") as f:
+            return tomllib.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_headless_secrets: dict | None = None
+
+
+def _get_secret(key: str, default: str = "") -> str:
+    global _headless_secrets
+    st = sys.modules.get("streamlit")
+    if st is not None:
+        try:
+            return st.secrets[key]
+        except (KeyError, FileNotFoundError):
+            pass
+    else:
+        if _headless_secrets is None:
+            _headless_secrets = _file_secrets()
+        if key in _headless_secrets:
+            return _headless_secrets[key]
+    return os.getenv(key, default)
+
+
+def _get_flag(key: str, default: bool) -> bool:
+    return str(_get_secret(key, str(default))).lower() in ("1", "true", "yes", "on")
 
 
 YOUTUBE_API_KEY: str = _get_secret("YOUTUBE_API_KEY")
 GEMINI_API_KEY: str = _get_secret("GEMINI_API_KEY")
+
+# Build the Gemini client and open its connection at server start
+GEMINI_WARMUP: bool = _get_flag("GEMINI_WARMUP", True)
+
+# Cache storage — "memory" (per process), "sqlite" (persistent file) or
+# "shared" (small per-process memory L1 in front of the SQLite file, so
+# several server processes reuse each other's results)
+CACHE_BACKEND: str = _get_secret("CACHE_BACKEND", "memory")
+CACHE_PATH: str = _get_secret("CACHE_PATH", ".cache/tubefit.db")
+
+# In-process memory budget — least-recently-used entries are evicted first
+CACHE_MAX_ENTRIES: int = int(_get_secret("CACHE_MAX_ENTRIES", "5000"))
+CACHE_MAX_BYTES: int = int(_get_secret("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL: int = int(_get_secret("CACHE_SWEEP_INTERVAL", "60"))
+
+# Local L1 in front of the shared store ("shared" backend only)
+CACHE_L1_MAX_ENTRIES: int = int(_get_secret("CACHE_L1_MAX_ENTRIES", "500"))
+CACHE_L1_TTL: int = int(_get_secret("CACHE_L1_TTL", "60"))
+
+# Background analysis of the preset personas when a video is first fetched,
+# capped at PREFETCH_MAX_PER_HOUR Gemini requests per process
+PREFETCH_PERSONAS: bool = _get_flag("PREFETCH_PERSONAS", False)
+PREFETCH_MAX_PER_HOUR: int = int(_get_secret("PREFETCH_MAX_PER_HOUR", "20"))
+
+# Custom personas at least this similar (cosine, 0–1) to one already
+# analysed for the same video reuse its analysis; above 1 disables matching
+PERSONA_MATCH_THRESHOLD: float = float(_get_secret("PERSONA_MATCH_THRESHOLD", "0.88"))
+
+# Stream Gemini's verdict so its first fields render while the rest generates
+GEMINI_STREAMING: bool = _get_flag("GEMINI_STREAMING", True)
+
+# Upstream resilience — retries with capped exponential backoff + jitter,
+# per-call timeouts (seconds) and a per-API circuit breaker
+RETRY_MAX_ATTEMPTS: int = int(_get_secret("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY: float = float(_get_secret("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY: float = float(_get_secret("RETRY_MAX_DELAY", "8"))
+YOUTUBE_TIMEOUT: float = float(_get_secret("YOUTUBE_TIMEOUT", "10"))
+GEMINI_TIMEOUT: float = float(_get_secret("GEMINI_TIMEOUT", "60"))
+BREAKER_FAILURES: int = int(_get_secret("BREAKER_FAILURES", "5"))
+BREAKER_RESET: float = float(_get_secret("BREAKER_RESET", "30"))
+
+# Alternative API hosts, e.g. a local fault-injecting stub server in tests
+YOUTUBE_API_ENDPOINT: str = _get_secret("YOUTUBE_API_ENDPOINT")
+GEMINI_API_ENDPOINT: str = _get_secret("GEMINI_API_ENDPOINT")
+
+# Upstream budgets (token buckets, per process; 0 disables a limit).
+# Defaults match the YouTube Data API daily quota and Gemini's free tier.
+YOUTUBE_DAILY_UNITS: int = int(_get_secret("YOUTUBE_DAILY_UNITS", "10000"))
+# Units that may be spent at once; the rest of the day's quota trickles in
+YOUTUBE_BURST_UNITS: int = int(_get_secret("YOUTUBE_BURST_UNITS", "300"))
+GEMINI_RPM: int = int(_get_secret("GEMINI_RPM", "10"))
+GEMINI_TPM: int = int(_get_secret("GEMINI_TPM", "250000"))
+RATE_LIMIT_MAX_WAIT: float = float(_get_secret("RATE_LIMIT_MAX_WAIT", "30"))
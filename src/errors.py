@@ -0,0 +1,35 @@
+"""
+Exceptions raised by the TubeFit core.
+
+The library never talks to the UI: failures surface as these typed
+exceptions (or as structured fields of a result), and each front end —
+the Streamlit app, the batch CLI — decides how to present them.
+"""
+
+
+class TubeFitError(Exception):
+    """Base class for every error the core raises on purpose."""
+
+
+class YouTubeError(TubeFitError):
+    """A YouTube Data API call failed."""
+
+
+class CommentsDisabledError(YouTubeError):
+    """The video's owner has turned comments off."""
+
+
+class GeminiError(TubeFitError):
+    """A Gemini request failed."""
+
+
+class GeminiResponseError(GeminiError):
+    """Gemini answered, but not with the JSON the prompt asked for."""
+
+
+class RateLimitError(TubeFitError):
+    """A call's budget would not free up within the wait limit."""
+
+
+class CircuitOpenError(TubeFitError):
+    """Raised instead of calling a dependency whose circuit is open."""
@@ -0,0 +1,102 @@
+"""
+Benchmark for the comment pre-filter — throughput on 10k comments and
+the share of prompt tokens it saves.
+
+    python -m src.filter_bench [-n 10000] [-r 3]
+    python -m src.filter_bench -i comments.jsonl
+
+Without -i, a reproducible synthetic comment section is generated: mostly
+distinct opinions, plus the noise the filter targets in roughly the
+proportions seen on popular tutorials — lightly edited copies, copy-pasted
+link spam, "first!", emoji-only and timestamp-only lines.  With -i, one
+comment dict (at least "text", optionally "likes") per JSONL line is used
+instead, e.g. comments saved from a real fetch.
+
+Tokens are counted as the prompt budget counts them (estimate_tokens per
+comment plus the separator).  Reports the best of -r runs; exits 1 if the
+filter saved nothing.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+
+from src.comment_filter import filter_comments
+from src.selection import SEPARATOR, estimate_tokens
+
+_WORDS = """
+    python install error works great thanks video version mac windows linux
+    gpu cuda tutorial step code broken fixed pip package import module
+    beginner explained clearly fast slow skip missing updated outdated docs
+    environment path terminal editor debug run test build deploy server
+""".split()
+_NOISE = [
+    "first!", "🔥🔥🔥", "😂😂", "12:34", "3:15 - 4:02", "who's watching in 2025?",
+    "nice", "check out my channel https://example.com/sub for more",
+]
+
+
+def synthetic_comments(n: int, seed: int = 0) -> list[dict]:
+    """n comments: ~65% distinct, ~15% near-duplicates, ~20% low-signal noise."""
+    rng, comments = random.Random(seed), []
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.20:
+            text = rng.choice(_NOISE)
+        elif roll < 0.35 and comments:
+            words = rng.choice(comments)["text"].split()
+            words[rng.randrange(len(words))] = rng.choice(_WORDS)   # light edit
+            text = " ".join(words)
+        else:
+            text = " ".join(rng.choices(_WORDS, k=rng.randint(8, 40))) + f" #{i}"
+        comments.append({"id": str(i), "text": text, "likes": rng.randint(0, 50)})
+    return comments
+
+
+def _tokens(comments: list[dict]) -> int:
+    sep = estimate_tokens(SEPARATOR)
+    return sum(estimate_tokens(c["text"]) + sep for c in comments)
+
+
+def run(comments: list[dict], repeats: int = 3) -> dict:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        kept  = filter_comments(comments)
+        best  = min(best, time.perf_counter() - start)
+    before, after = _tokens(comments), _tokens(kept)
+    return {
+        "comments"          : len(comments),
+        "kept"              : len(kept),
+        "seconds"           : round(best, 3),
+        "comments_per_s"    : round(len(comments) / best),
+        "tokens_before"     : before,
+        "tokens_after"      : after,
+        "tokens_saved_pct"  : round(100 * (before - after) / before, 1) if before else 0.0,
+    }
+
+
+def _read_comments(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.filter_bench",
+        description="Throughput and prompt tokens saved by the comment pre-filter.",
+    )
+    parser.add_argument("-n", "--comments", type=int, default=10_000)
+    parser.add_argument("-i", "--input", help="JSONL file of comment dicts instead of synthetic ones")
+    parser.add_argument("-r", "--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    comments = _read_comments(args.input) if args.input else synthetic_comments(args.comments)
+    result   = run(comments, args.repeats)
+    print(json.dumps(result))
+    return 0 if result["tokens_after"] < result["tokens_before"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
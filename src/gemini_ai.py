@@ -1,14 +1,38 @@
 """
 Gemini AI integration — analyses YouTube comments for a given viewer persona
-and returns a structured JSON verdict.
+(or several personas in one request) and returns a structured JSON verdict.
+
+The GenerativeModel (with its long system instruction) is built once per
+process per (model name, generation config) and reused by every call.
+google.generativeai is imported and configured when the first model is
+built, not at import, so it stays off the app's start-up path, and
+warm_up() builds it ahead of time and makes one cheap request so the
+first real analysis doesn't pay client setup and the TLS handshake.
+Requests have a GEMINI_TIMEOUT, go through the shared retry /
+circuit-breaker layer (see resilience) and draw their request and
+estimated token cost from the rate limiter (see rate_limit).  Failures
+are raised as the typed exceptions in errors; nothing here touches the UI.
+
+Single-persona analyses can be streamed: fields of the JSON verdict are
+handed to a callback as they complete (see partial_json), and the time
+to the first meaningful field is tracked separately from total latency.
 """
 import json
-import streamlit as st
-import google.generativeai as genai
+import time
+import threading
+from typing import TYPE_CHECKING, Any, Callable
+
+from src.config import GEMINI_API_KEY, GEMINI_API_ENDPOINT, GEMINI_TIMEOUT
+from src.resilience import with_resilience
+from src.rate_limit import acquire
+from src.errors import TubeFitError, GeminiError, GeminiResponseError
+from src.selection import SEPARATOR, CHARS_PER_TOKEN, estimate_tokens, select_comments
+from src.partial_json import PartialJSON
 
-from src.config import GEMINI_API_KEY
+if TYPE_CHECKING:
+    import google.generativeai as genai
 
-genai.configure(api_key=GEMINI_API_KEY)
+_REQUEST_OPTIONS = {"timeout": GEMINI_TIMEOUT}
 
 _SYSTEM_INSTRUCTION = """
 You are an intelligent YouTube comment analyst. Your job is to analyse YouTube
@@ -39,33 +63,213 @@ You MUST respond in valid JSON ONLY with this exact structure:
 }
 """
 
-_MAX_CHARS = 35_000
+INPUT_TOKEN_BUDGET = 8_000           # comment tokens per prompt
+_OUTPUT_TOKEN_ESTIMATE = 1_000       # a verdict, for rate-limit accounting
+
+_MODEL_NAME        = "gemini-2.5-flash"
+_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# Fields worth showing before the rest of a streamed verdict arrives
+MEANINGFUL_FIELDS = ("verdict", "confidence_score", "summary")
+
+_stream_stats = {"streams": 0, "first_content": 0.0, "total": 0.0}
+_stream_stats_lock = threading.Lock()
+
+_models: dict[tuple[str, str], "genai.GenerativeModel"] = {}
+_models_lock = threading.Lock()
+
+
+def _configure(genai) -> None:
+    """Point the client at GEMINI_API_KEY (and GEMINI_API_ENDPOINT, if set)."""
+    if GEMINI_API_ENDPOINT:
+        genai.configure(
+            api_key=GEMINI_API_KEY, transport="rest",
+            client_options={"api_endpoint": GEMINI_API_ENDPOINT},
+        )
+    else:
+        genai.configure(api_key=GEMINI_API_KEY)
+
+
+def _get_model(
+    model_name: str = _MODEL_NAME,
+    generation_config: dict = _GENERATION_CONFIG,
+) -> "genai.GenerativeModel":
+    """Return the process-wide model for this name + config, building it once."""
+    key = (model_name, json.dumps(generation_config, sort_keys=True))
+    model = _models.get(key)
+    if model is None:
+        with _models_lock:
+            model = _models.get(key)
+            if model is None:
+                import google.generativeai as genai
+                if not _models:       # first model in this process
+                    _configure(genai)
+                model = _models[key] = genai.GenerativeModel(
+                    model_name=model_name,
+                    system_instruction=_SYSTEM_INSTRUCTION,
+                    generation_config=generation_config,
+                )
+    return model
 
 
-def analyze_comments_with_gemini(comments: list[dict], persona: str) -> dict | None:
+def warm_up() -> None:
     """
-    Send comment list + persona to Gemini 2.5 Flash and return parsed JSON.
-    Returns None on failure.
+    Build the shared model and open its connection with a token count
+    (no generation, no quota).  Best effort — failures are ignored and
+    the first real call simply pays the setup cost instead.
     """
-    if not comments:
-        return None
+    try:
+        _get_model().count_tokens("warm-up", request_options=_REQUEST_OPTIONS)
+    except Exception:
+        pass
+
+
+def _generate(
+    persona: str, comments_text: str, on_field: Callable[[str, Any], None] | None = None,
+) -> dict | None:
+    return _request(f"User Persona: {persona}\n\nYouTube Comments:\n{comments_text}", on_field)
 
-    comments_text = "\n---\n".join(c["text"] for c in comments)
-    if len(comments_text) > _MAX_CHARS:
-        comments_text = comments_text[:_MAX_CHARS]
 
-    prompt = f"User Persona: {persona}\n\nYouTube Comments:\n{comments_text}"
+def _stream(prompt: str, on_field: Callable[[str, Any], None]) -> Any:
+    """
+    Stream the response, calling on_field(name, value) for each top-level
+    field as soon as it is complete, and record time to the first
+    meaningful field next to total latency.
+    """
+    started, first = time.perf_counter(), None
+    parser, parts  = PartialJSON(), []
+    for chunk in _get_model().generate_content(
+        prompt, stream=True, request_options=_REQUEST_OPTIONS,
+    ):
+        parts.append(chunk.text)
+        for name, value in parser.feed(chunk.text):
+            if first is None and name in MEANINGFUL_FIELDS:
+                first = time.perf_counter() - started
+            on_field(name, value)
+    total = time.perf_counter() - started
+    with _stream_stats_lock:
+        _stream_stats["streams"]       += 1
+        _stream_stats["first_content"] += total if first is None else first
+        _stream_stats["total"]         += total
+    return json.loads("".join(parts))
+
 
+def stream_stats() -> dict:
+    """Average time to first meaningful field and total time of streamed calls (s)."""
+    with _stream_stats_lock:
+        n = _stream_stats["streams"]
+        return {
+            "streams"        : n,
+            "first_content_s": _stream_stats["first_content"] / n if n else 0.0,
+            "total_s"        : _stream_stats["total"] / n if n else 0.0,
+        }
+
+
+def _request(prompt: str, on_field: Callable[[str, Any], None] | None = None) -> Any:
+    """
+    Send prompt and return the parsed JSON reply.  Raises
+    GeminiResponseError for a reply that isn't JSON, GeminiError for a
+    failed request, and lets RateLimitError / CircuitOpenError through.
+    """
+    tokens = estimate_tokens(_SYSTEM_INSTRUCTION + prompt) + _OUTPUT_TOKEN_ESTIMATE
+    charge = lambda: acquire("gemini", requests=1, tokens=tokens)
     try:
-        model = genai.GenerativeModel(
-            model_name="gemini-2.5-flash",
-            system_instruction=_SYSTEM_INSTRUCTION,
-            generation_config={"response_mime_type": "application/json"},
+        if on_field is not None:
+            return with_resilience("gemini", lambda: _stream(prompt, on_field), charge=charge)
+        text = with_resilience(
+            "gemini",
+            lambda: _get_model().generate_content(prompt, request_options=_REQUEST_OPTIONS).text,
+            charge=charge,
         )
-        response = model.generate_content(prompt)
-        return json.loads(response.text)
+        return json.loads(text)
     except json.JSONDecodeError as e:
-        st.error(f"Failed to parse Gemini response as JSON: {e}")
+        raise GeminiResponseError(f"Failed to parse Gemini response as JSON: {e}") from e
+    except TubeFitError:
+        raise
     except Exception as e:
-        st.error(f"Error analysing with Gemini: {e}")
-    return None
+        raise GeminiError(f"Error analysing with Gemini: {e}") from e
+
+
+def analyze_comments_with_gemini(
+    comments: list[dict], persona: str, on_field: Callable[[str, Any], None] | None = None,
+) -> dict | None:
+    """
+    Send comment list + persona to Gemini 2.5 Flash and return parsed JSON.
+    With on_field, the response is streamed and on_field(name, value) is
+    called for each top-level field as it completes.  Returns None when
+    there are no comments; raises GeminiError on failure.
+    """
+    if not comments:
+        return None
+
+    selected = select_comments(comments, INPUT_TOKEN_BUDGET)
+    if selected:
+        comments_text = SEPARATOR.join(c["text"] for c in selected)
+    else:                             # all noise, or one comment over the budget
+        comments_text = comments[0]["text"][: INPUT_TOKEN_BUDGET * CHARS_PER_TOKEN]
+    return _generate(persona, comments_text, on_field)
+
+
+def analyze_comments_for_personas(
+    comments: list[dict], personas: list[str],
+) -> dict[str, dict] | None:
+    """
+    Analyse one comment set for several personas in a single request:
+    the comments are sent once, and Gemini returns one verdict per persona
+    in the usual schema.  Returns {persona: result}; raises GeminiError on
+    failure, GeminiResponseError for a reply with the wrong number of
+    verdicts.
+    """
+    if not comments or not personas:
+        return None
+
+    selected = select_comments(comments, INPUT_TOKEN_BUDGET)
+    if selected:
+        comments_text = SEPARATOR.join(c["text"] for c in selected)
+    else:
+        comments_text = comments[0]["text"][: INPUT_TOKEN_BUDGET * CHARS_PER_TOKEN]
+    persona_list = "\n".join(f"{i}. {p}" for i, p in enumerate(personas, 1))
+    parsed = _request(
+        f"User Personas:\n{persona_list}\n\n"
+        f"Evaluate the comments separately for each of these {len(personas)} personas. "
+        f"Respond with a JSON array holding one object per persona, in the order "
+        f"listed, each in exactly the structure above.\n\n"
+        f"YouTube Comments:\n{comments_text}"
+    )
+    if isinstance(parsed, dict) and len(parsed) == 1:
+        parsed = next(iter(parsed.values()))      # {"analyses": [...]} wrapper
+    if not isinstance(parsed, list) or len(parsed) != len(personas) \
+            or not all(isinstance(r, dict) for r in parsed):
+        raise GeminiResponseError("Gemini returned an unexpected multi-persona response.")
+    return dict(zip(personas, parsed))
+
+
+def analyze_comment_chunk(chunk: list[dict], persona: str) -> dict | None:
+    """
+    Map step of map-reduce mode: analyse one pre-sized chunk as-is (no
+    further selection).  Raises GeminiError on failure.
+    """
+    if not chunk:
+        return None
+    return _generate(persona, SEPARATOR.join(c["text"] for c in chunk))
+
+
+def update_analysis_with_delta(
+    previous: dict, new_comments: list[dict], persona: str, previous_count: int,
+) -> dict | None:
+    """
+    Revise an earlier verdict in light of comments posted since, sending
+    only the previous JSON and the new comments instead of the full set.
+    Raises GeminiError on failure.
+    """
+    selected = select_comments(new_comments, INPUT_TOKEN_BUDGET)
+    if not selected:
+        return previous
+    comments_text = (
+        f"Previous analysis, based on {previous_count} earlier comments:\n"
+        f"{json.dumps(previous)}\n\n"
+        f"Update it to reflect these {len(new_comments)} new comments, weighting "
+        f"them by their share of all comments. Return the full updated JSON.\n\n"
+        + SEPARATOR.join(c["text"] for c in selected)
+    )
+    return _generate(persona, comments_text)
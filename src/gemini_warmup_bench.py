@@ -0,0 +1,175 @@
+"""
+Time to first verdict for a cold and a warmed-up process, against a local
+fake Gemini endpoint.
+
+    python -m src.gemini_warmup_bench [-r 5] [--connect-delay 0.05] [--latency 0.3]
+
+The fake endpoint speaks Gemini's REST API (countTokens, generateContent,
+streamGenerateContent) on 127.0.0.1.  It stalls each new connection for
+--connect-delay seconds (the TLS handshake's stand-in) and streams a fixed
+verdict in three parts over --latency seconds.
+
+Every run is a fresh process making one streamed analysis:
+
+  cold : the first analysis pays the google.generativeai import, client
+         setup, model construction and the new connection
+  warm : warm_up() runs first, as the app does at server start, and the
+         analysis is timed after it
+
+first_s is the time to the first meaningful verdict field (the app shows
+it as soon as it arrives), total_s the time to the full result.
+GEMINI_API_ENDPOINT / GEMINI_API_KEY point the children at the fake, with
+the Gemini rate limit disabled.  Requires google-generativeai.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_VERDICT = json.dumps({
+    "verdict": "Suitable", "confidence_score": 82,
+    "summary": "Viewers at this level found the tutorial easy to follow.",
+    "positive_signals": ["clear steps"], "negative_signals": [], "warnings": [],
+})
+
+
+def _response(text: str) -> dict:
+    return {"candidates": [{
+        "content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP",
+    }]}
+
+
+def start_fake_gemini(connect_delay: float, latency: float) -> ThreadingHTTPServer:
+    """Serve a fake Gemini REST API on a free local port until server.shutdown()."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            time.sleep(connect_delay)            # once per connection
+            super().setup()
+
+        def _send(self, body: bytes, chunked: bool = False) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+            else:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not chunked:
+                self.wfile.write(body)
+
+        def _chunk(self, data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if ":countTokens" in self.path:
+                return self._send(json.dumps({"totalTokens": 1}).encode())
+            if ":generateContent" in self.path:
+                time.sleep(latency)
+                return self._send(json.dumps(_response(_VERDICT)).encode())
+            # streamGenerateContent: a JSON array of partial responses
+            cut   = [0, len(_VERDICT) // 3, 2 * len(_VERDICT) // 3, len(_VERDICT)]
+            parts = [_VERDICT[a:b] for a, b in zip(cut, cut[1:])]
+            self._send(b"", chunked=True)
+            for i, part in enumerate(parts):
+                time.sleep(latency / len(parts))
+                self._chunk((b"[" if i == 0 else b",") + json.dumps(_response(part)).encode())
+            self._chunk(b"]")
+            self._chunk(b"")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def first_verdict(warm: bool) -> dict:
+    """In this (fresh) process: optionally warm up, then time one streamed analysis."""
+    from src.gemini_ai import MEANINGFUL_FIELDS, warm_up, analyze_comments_with_gemini
+
+    if warm:
+        warm_up()
+    comments = [{"text": f"Followed along on day {i}, works fine.", "likes": i} for i in range(20)]
+    start, first = time.perf_counter(), []
+
+    def on_field(name: str, value) -> None:
+        if not first and name in MEANINGFUL_FIELDS:
+            first.append(time.perf_counter() - start)
+
+    result = analyze_comments_with_gemini(comments, "A complete beginner", on_field=on_field)
+    total  = time.perf_counter() - start
+    return {
+        "first_s": round(first[0] if first else total, 3),
+        "total_s": round(total, 3),
+        "ok"     : bool(result and result.get("verdict")),
+    }
+
+
+def _child(endpoint: str, mode: str) -> dict:
+    env = {
+        **os.environ, "GEMINI_API_ENDPOINT": endpoint, "GEMINI_API_KEY": "bench",
+        "GEMINI_RPM": "0", "GEMINI_TPM": "0", "GEMINI_WARMUP": "false",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-m", "src.gemini_warmup_bench", "--child", mode],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "benchmark child failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run(runs: int = 5, connect_delay: float = 0.05, latency: float = 0.3) -> list[dict]:
+    server   = start_fake_gemini(connect_delay, latency)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        rows = []
+        for mode in ("cold", "warm"):
+            results = [_child(endpoint, mode) for _ in range(runs)]
+            rows.append({
+                "process" : mode,
+                "first_s" : round(statistics.median(r["first_s"] for r in results), 3),
+                "total_s" : round(statistics.median(r["total_s"] for r in results), 3),
+                "ok"      : all(r["ok"] for r in results),
+            })
+        return rows
+    finally:
+        server.shutdown()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.gemini_warmup_bench",
+        description="Time to first verdict, cold vs warmed-up process, on a fake Gemini endpoint.",
+    )
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    parser.add_argument("--connect-delay", type=float, default=0.05)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds to stream the verdict")
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(first_verdict(args.child == "warm")))
+        return 0
+
+    rows = run(args.runs, args.connect_delay, args.latency)
+    for row in rows:
+        print(json.dumps(row))
+    cold, warm = rows
+    return 0 if cold["ok"] and warm["ok"] and warm["first_s"] < cold["first_s"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
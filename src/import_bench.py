@@ -0,0 +1,72 @@
+"""
+Import-time benchmark for the headless path — what `import src.batch`
+costs and pulls in.
+
+    python -m src.import_bench [-t 15] [--module src.batch]
+
+A fresh interpreter runs `python -X importtime -c "import src.batch"`.
+From its report this prints the total cumulative import time (every
+top-level import, interpreter start-up modules included), the time for
+--module alone, and the -t slowest imports by cumulative time.
+
+The batch runner must not need the UI or any client library until it
+makes a call: exits 1 if any of FORBIDDEN_MODULES (or a submodule) shows
+up in the import graph.
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+FORBIDDEN_MODULES = ("streamlit", "googleapiclient", "google.generativeai")
+
+
+def _parse(report: str) -> list[tuple[str, int, int]]:
+    """(module, cumulative µs, depth) for each `import time:` line."""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2 - 1   # one leading space at the top level
+        rows.append((name.strip(), int(cumulative), depth))
+    return rows
+
+
+def measure(module: str = "src.batch", top: int = 15) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "benchmark failed")
+    rows = _parse(proc.stderr)
+    slowest = sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+    return {
+        "module"   : module,
+        "total_ms" : round(sum(us for _, us, depth in rows if depth == 0) / 1e3, 1),
+        "module_ms": round(next((us for name, us, _ in rows if name == module), 0) / 1e3, 1),
+        "slowest"  : [{"module": name, "cumulative_ms": round(us / 1e3, 1)} for name, us, _ in slowest],
+        "forbidden": [
+            bad for bad in FORBIDDEN_MODULES
+            if any(name == bad or name.startswith(bad + ".") for name, _, _ in rows)
+        ],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.import_bench",
+        description="Import time and import graph of the headless batch path.",
+    )
+    parser.add_argument("-t", "--top", type=int, default=15)
+    parser.add_argument("--module", default="src.batch")
+    args = parser.parse_args(argv)
+
+    result = measure(args.module, args.top)
+    print(json.dumps(result))
+    return 0 if not result["forbidden"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
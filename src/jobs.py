@@ -0,0 +1,146 @@
+"""
+Background analysis jobs — the fetch → analyse pipeline run off the
+Streamlit script thread.
+
+submit_analysis() returns a Job at once; the app keeps only its id in
+session state and polls status / progress, so a rerun (a sidebar toggle,
+a second tab) never blocks on or restarts a slow Gemini call.  Job ids
+are derived from the request, so submitting the same video + persona +
+comment settings while a job is still running attaches to that job
+instead of starting another.  While Gemini streams its verdict, the
+fields completed so far are exposed as job.partial for the page to show
+early.  Results land in the cache via the pipeline as usual; finished
+jobs are kept for JOB_RETAIN seconds so the page can render them.
+Failures end the job with job.error set; nothing here touches the UI.
+"""
+import time
+import logging
+import hashlib
+import threading
+from functools import partial
+from typing import Any
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import GEMINI_STREAMING
+from src.gemini_ai import MEANINGFUL_FIELDS, analyze_comments_with_gemini
+from src.pipeline import fetch_video_data, analyse_video
+from src.prefetch import schedule_prefetch
+from src.errors import TubeFitError
+
+JOB_WORKERS = 4                       # analyses running at once per process
+JOB_RETAIN  = 10 * 60                 # keep finished jobs for 10 minutes
+
+_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="tubefit-job")
+_jobs: dict[str, "Job"] = {}
+_jobs_lock = threading.Lock()
+
+log = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    One analysis request.  status moves queued → fetching → analysing →
+    done (or failed); progress (0–100) and message describe the current
+    stage for the progress bar.  first_content_s / total_s time the first
+    meaningful verdict field and the whole job from submission.
+    """
+
+    def __init__(self, job_id: str, video_id: str, persona: str, max_comments: int, sort_order: str):
+        self.id           = job_id
+        self.video_id     = video_id
+        self.persona      = persona
+        self.max_comments = max_comments
+        self.sort_order   = sort_order
+        self.status       = "queued"
+        self.progress     = 0
+        self.message      = "Waiting for a free worker…"
+        self.fetched: dict | None   = None
+        self.result: dict | None    = None
+        self.analysis_age: float | None = None
+        self.matched_persona: str | None = None
+        self.partial: dict[str, Any] = {}
+        self.error: str | None      = None
+        self.created_at   = time.time()
+        self.finished_at: float | None = None
+        self.first_content_s: float | None = None
+        self.total_s: float | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def _update(self, status: str, progress: int, message: str) -> None:
+        self.status, self.progress, self.message = status, progress, message
+        if self.done:
+            self.finished_at = time.time()
+            self.total_s     = self.finished_at - self.created_at
+            if self.first_content_s is None and self.result:
+                self.first_content_s = self.total_s
+
+    def _on_match(self, persona: str) -> None:
+        self.matched_persona = persona
+
+    def _on_field(self, name: str, value: Any) -> None:
+        self.partial[name] = value
+        if self.first_content_s is None and name in MEANINGFUL_FIELDS:
+            self.first_content_s = time.time() - self.created_at
+        self.progress = min(95, self.progress + 3)
+
+
+def job_id_for(video_id: str, persona: str, max_comments: int, sort_order: str) -> str:
+    raw = "\x00".join((video_id, persona, str(max_comments), sort_order))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _run(job: Job) -> None:
+    try:
+        job._update(
+            "fetching", 10, f"Fetching video information and {job.max_comments} comments…",
+        )
+        fetched = job.fetched = fetch_video_data(job.video_id, job.max_comments, job.sort_order)
+        comments = fetched["comments"]
+        if comments:
+            job._update(
+                "analysing", 62, f"Gemini is analysing {len(comments)} comments for your persona…",
+            )
+            analyse = (
+                partial(analyze_comments_with_gemini, on_field=job._on_field)
+                if GEMINI_STREAMING else analyze_comments_with_gemini
+            )
+            job.result, job.analysis_age = analyse_video(
+                job.video_id, job.persona, comments, fetched["comment_set"],
+                analyse=analyse, on_match=job._on_match,
+            )
+            if fetched["comments_age"] is None:   # first fetch — warm the other presets
+                schedule_prefetch(job.video_id, comments, fetched["comment_set"], skip=job.persona)
+        job._update("done", 100, "Analysis complete!")
+    except TubeFitError as e:
+        job.error = str(e)
+        job._update("failed", 100, "Analysis failed.")
+    except Exception as e:
+        log.exception("Job %s failed", job.id)
+        job.error = f"Unexpected error: {e}"
+        job._update("failed", 100, "Analysis failed.")
+
+
+def _prune(now: float) -> None:
+    for job_id in [i for i, j in _jobs.items() if j.done and now - j.finished_at > JOB_RETAIN]:
+        del _jobs[job_id]
+
+
+def submit_analysis(video_id: str, persona: str, max_comments: int, sort_order: str) -> Job:
+    """Start an analysis job, or return the matching one still in progress."""
+    job_id = job_id_for(video_id, persona, max_comments, sort_order)
+    with _jobs_lock:
+        _prune(time.time())
+        job = _jobs.get(job_id)
+        if job is not None and not job.done:
+            return job
+        job = _jobs[job_id] = Job(job_id, video_id, persona, max_comments, sort_order)
+    _pool.submit(_run, job)
+    return job
+
+
+def get_job(job_id: str) -> Job | None:
+    with _jobs_lock:
+        return _jobs.get(job_id)
@@ -0,0 +1,163 @@
+"""
+Map-reduce analysis for comment sets too large for one Gemini prompt.
+
+  map    : comments are filtered, ordered oldest → newest and packed into
+           prompt-sized chunks; each chunk is analysed on its own.
+  reduce : the partial verdicts are merged back into the single result
+           schema the UI expects.
+
+Chunk boundaries are content-defined: comments are ordered oldest →
+newest and a chunk ends after any comment whose hashed id falls under a
+threshold proportional to its token cost (about one cut per
+token_budget / 2 tokens), or early when the next comment would overflow
+the budget.  Whether a comment ends a chunk depends on that comment
+alone, so adding or dropping comments — new ones at the end, the oldest
+falling out of the fetch window, a relevance refetch swapping a few in
+the middle — only changes the chunks that contain them, and every other
+chunk is still a cache hit (see pipeline.analyse_video).
+
+Merge rules (weight = comments represented by the chunk):
+  verdict          : the verdict with the largest Σ weight × confidence
+  confidence_score : Σ weight × confidence over chunks that agree with the
+                     final verdict, divided by the total weight — so
+                     disagreement between chunks lowers confidence
+  sentiment        : weighted mean, re-normalised to 100
+  keywords         : weighted frequency, case-insensitively deduplicated
+  lists            : union, deduplicated, strongest chunks first
+  text fields      : taken from the strongest chunk with the final verdict
+"""
+import zlib
+
+from src.comment_filter import filter_comments
+from src.selection import SEPARATOR, estimate_tokens
+
+CHUNK_TOKEN_BUDGET = 6_000
+
+_MAX_LIST_ITEMS = 5
+_MAX_KEYWORDS   = 5
+
+
+def needs_map_reduce(comments: list[dict], token_budget: int) -> bool:
+    """True when the filtered comments would not fit in one prompt."""
+    sep = estimate_tokens(SEPARATOR)
+    return sum(estimate_tokens(c["text"]) + sep for c in filter_comments(comments)) > token_budget
+
+
+def _ends_chunk(comment: dict, cost: int, target: int) -> bool:
+    """Content-defined cut: true for ~cost/target of comments, by id hash."""
+    ref = comment.get("id") or comment["text"]
+    return zlib.crc32(ref.encode("utf-8")) % target < cost
+
+
+def chunk_comments(comments: list[dict], token_budget: int = CHUNK_TOKEN_BUDGET) -> list[list[dict]]:
+    """
+    Split filtered comments into chunks of at most token_budget tokens,
+    oldest first, cutting at content-defined boundaries (see module
+    docstring).  Comments are never split; one longer than the budget
+    gets a chunk of its own.
+    """
+    ordered = sorted(
+        filter_comments(comments),
+        key=lambda c: (c.get("published_at", ""), c["text"]),
+    )
+    sep    = estimate_tokens(SEPARATOR)
+    target = max(token_budget // 2, 1)
+    chunks, current, used = [], [], 0
+    for c in ordered:
+        cost = estimate_tokens(c["text"]) + sep
+        if current and used + cost > token_budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(c)
+        used += cost
+        if _ends_chunk(c, cost, target):
+            chunks.append(current)
+            current, used = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_weight(chunk: list[dict]) -> int:
+    """Number of original comments a chunk stands for, duplicates included."""
+    return sum(1 + c.get("duplicates", 0) for c in chunk)
+
+
+def _union(lists: list[list[str]]) -> list[str]:
+    seen, merged = set(), []
+    for items in lists:
+        for item in items:
+            key = item.strip().lower()
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged[:_MAX_LIST_ITEMS]
+
+
+def merge_analyses(partials: list[tuple[dict, int]]) -> dict | None:
+    """Reduce [(chunk_result, weight), …] to one result in the standard schema."""
+    partials = [(r, w) for r, w in partials if r and w > 0]
+    if not partials:
+        return None
+    if len(partials) == 1:
+        return partials[0][0]
+
+    total = sum(w for _, w in partials)
+
+    def confidence(r: dict) -> float:
+        try:
+            return float(r.get("confidence_score", 0))
+        except (TypeError, ValueError):
+            return 0.0
+
+    votes: dict[str, float] = {}
+    for r, w in partials:
+        v = r.get("verdict", "CAUTION")
+        votes[v] = votes.get(v, 0.0) + w * confidence(r)
+    verdict = max(votes, key=votes.get) if any(votes.values()) else "CAUTION"
+
+    agreeing = [(r, w) for r, w in partials if r.get("verdict", "CAUTION") == verdict]
+    strength = sorted(partials, key=lambda p: p[1] * confidence(p[0]), reverse=True)
+    lead     = max(agreeing, key=lambda p: p[1] * confidence(p[0]))[0] if agreeing else strength[0][0]
+
+    sentiment = {}
+    for field in ("positive", "neutral", "negative"):
+        sentiment[field] = sum(
+            w * float(r.get("sentiment_breakdown", {}).get(field, 0) or 0) for r, w in partials
+        ) / total
+    scale = 100 / (sum(sentiment.values()) or 1)
+    sentiment = {k: round(v * scale) for k, v in sentiment.items()}
+
+    keyword_weight: dict[str, float] = {}
+    keyword_label:  dict[str, str]   = {}
+    for r, w in partials:
+        for kw in r.get("top_keywords", []):
+            key = kw.strip().lower()
+            if key:
+                keyword_weight[key] = keyword_weight.get(key, 0.0) + w
+                keyword_label.setdefault(key, kw)
+    keywords = sorted(keyword_weight, key=keyword_weight.get, reverse=True)[:_MAX_KEYWORDS]
+
+    difficulty: dict[str, float] = {}
+    for r, w in partials:
+        level = r.get("difficulty_level", "Mixed")
+        difficulty[level] = difficulty.get(level, 0.0) + w
+
+    concerns = _union([
+        [r.get("version_concerns", "None")] for r, _ in strength
+        if str(r.get("version_concerns", "None")).strip().lower() != "none"
+    ])
+
+    return {
+        "verdict": verdict,
+        "confidence_score": round(sum(w * confidence(r) for r, w in agreeing) / total),
+        "summary": lead.get("summary", ""),
+        "positive_aspects": _union([r.get("positive_aspects", []) for r, _ in strength]),
+        "red_flags": _union([r.get("red_flags", []) for r, _ in strength]),
+        "sentiment_breakdown": sentiment,
+        "top_keywords": [keyword_label[k] for k in keywords],
+        "community_tips": _union([r.get("community_tips", []) for r, _ in strength]),
+        "difficulty_level": max(difficulty, key=difficulty.get),
+        "version_concerns": "; ".join(concerns) if concerns else "None",
+        "recommendation": lead.get("recommendation", ""),
+    }
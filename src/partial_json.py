@@ -0,0 +1,65 @@
+"""
+Incremental parser for a streamed JSON object.
+
+Gemini streams its JSON verdict in arbitrary text chunks.  PartialJSON
+is fed those chunks and reports each top-level field as soon as its value
+is complete — "verdict" and "confidence_score" arrive long before the
+lists at the end — so the UI can render them while generation goes on.
+Each character is scanned once; nothing is re-parsed from the start.
+"""
+import json
+from typing import Any
+
+
+class PartialJSON:
+    """Feed chunks of one JSON object; get back its completed top-level fields."""
+
+    def __init__(self):
+        self.buf       = ""
+        self.pos       = 0            # next character to scan
+        self.depth     = 0
+        self.in_string = False
+        self.escape    = False
+        self.start     = None         # start of the current top-level member
+        self.fields: dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """Add chunk; return the (name, value) pairs completed by it, in order."""
+        self.buf += chunk
+        done = []
+        for i in range(self.pos, len(self.buf)):
+            ch = self.buf[i]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self.start = i + 1
+            elif ch in "}]" or (ch == "," and self.depth == 1):
+                if self.depth == 1 and self.start is not None:
+                    member = self._parse(self.buf[self.start:i])
+                    if member is not None:
+                        self.fields.update([member])
+                        done.append(member)
+                    self.start = i + 1
+                if ch != ",":
+                    self.depth -= 1
+        self.pos = len(self.buf)
+        return done
+
+    @staticmethod
+    def _parse(member: str) -> tuple[str, Any] | None:
+        if not member.strip():
+            return None
+        try:
+            (name, value), = json.loads("{" + member + "}").items()
+        except ValueError:
+            return None
+        return name, value
@@ -0,0 +1,108 @@
+"""
+Built-in viewer personas shown in the persona dropdown, and the text
+similarity used to match free-form Custom personas to cached ones.
+
+Similarity is a cosine over character 3-gram counts of the normalised
+text (lower-cased, punctuation and filler words dropped), so word order,
+"I'm a" / "on my" and small spelling differences barely matter:
+"beginner on mac learning pytorch" and "I'm a beginner learning PyTorch
+on my Mac" are the same persona.
+
+Versions and negations are what a verdict most often hinges on, yet they
+are a character or two of the text ("python 2" / "python 3", "no GPU" /
+"a GPU") and barely move the cosine.  persona_guard extracts them, and
+two personas are only compared when their guards agree exactly.
+
+The same holds for any single content word in a long text: "learning
+PyTorch on a Mac" and "learning TensorFlow on a Mac" score above 0.9.
+same_content_words therefore requires every non-filler word one text has
+and the other lacks to be a spelling variant of a word the other has
+("beginners" / "beginner", "pytorch" / "pytroch"), not a different one.
+"""
+import re
+import math
+from collections import Counter
+from difflib import SequenceMatcher
+
+PERSONA_OPTIONS = {
+    "The Debugger":      "A developer troubleshooting a specific issue. Wants to know if the code in the video actually works, or if it is broken/outdated.",
+    "The Newbie":        "A complete beginner with zero prior experience. Wants to know if the tutorial is too fast, skips steps, or assumes prior knowledge.",
+    "The Legacy User":   "Someone on older hardware or an older software version. Wants to know if the tutorial applies to their specific setup.",
+    "The Speed Learner": "An experienced person who just wants a quick overview. Wants to know if the video is concise or overly padded.",
+    "The Professional":  "A professional evaluating if this content is accurate, credible, and production-ready.",
+    "Custom":            "Describe your own situation in detail.",
+}
+
+# Descriptions of the presets (everything but "Custom"), in dropdown order
+PRESET_PERSONAS: list[str] = [d for name, d in PERSONA_OPTIONS.items() if name != "Custom"]
+
+_STOPWORDS = frozenset("""
+    a an the i im i'm me my mine am is are was be been being and or but to of
+    for on in at with by from as who that which this it its just really very
+    so some someone somebody person user trying want wants looking
+""".split())
+
+_WORD = re.compile(r"[a-z0-9+#']+")
+_NEGATIONS = frozenset({"no", "not", "without", "never", "non", "dont", "don't", "cant", "can't"})
+
+# Two differing words are spelling variants at or above this SequenceMatcher
+# ratio, if they also start with the same letter ("react" ≠ "preact")
+_VARIANT_RATIO = 0.8
+
+
+def normalise_persona(text: str) -> str:
+    """Lower-case, drop punctuation and filler words, collapse whitespace."""
+    words = _WORD.findall(text.lower().replace("’", "'"))
+    return " ".join(w for w in words if w not in _STOPWORDS)
+
+
+def persona_guard(text: str) -> frozenset[str]:
+    """
+    Tokens two personas must share to be matched: every word containing a
+    digit ("3", "v17", "python3") and every negation with the word after
+    it ("no gpu", "not beginner").
+    """
+    words = normalise_persona(text).split()
+    guard = {w for w in words if any(ch.isdigit() for ch in w)}
+    guard.update(
+        f"{w} {words[i + 1]}" if i + 1 < len(words) else w
+        for i, w in enumerate(words) if w in _NEGATIONS
+    )
+    return frozenset(guard)
+
+
+def _spelling_variant(a: str, b: str) -> bool:
+    return a[0] == b[0] and SequenceMatcher(None, a, b).ratio() >= _VARIANT_RATIO
+
+
+def same_content_words(a: str, b: str) -> bool:
+    """
+    True when the normalised texts use the same non-filler words, up to
+    spelling variants: each word only one side has must be a variant of a
+    word only the other side has ("pytorch" ≠ "tensorflow", "mac" ≠
+    "windows laptop").
+    """
+    words_a = set(normalise_persona(a).split())
+    words_b = set(normalise_persona(b).split())
+    only_a, only_b = words_a - words_b, words_b - words_a
+    return (
+        all(any(_spelling_variant(w, v) for v in only_b) for w in only_a)
+        and all(any(_spelling_variant(w, v) for v in only_a) for w in only_b)
+    )
+
+
+def persona_vector(text: str) -> dict[str, float]:
+    """L2-normalised character 3-gram counts of the normalised persona text."""
+    grams = Counter()
+    for word in normalise_persona(text).split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    norm = math.sqrt(sum(n * n for n in grams.values())) or 1.0
+    return {g: n / norm for g, n in grams.items()}
+
+
+def persona_similarity(a: dict[str, float], b: dict[str, float]) -> float:
+    """Cosine similarity of two persona_vector results (0 … 1)."""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(g, 0.0) for g, w in a.items())
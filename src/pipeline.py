@@ -0,0 +1,279 @@
+"""
+Analysis pipeline — the fetch → analyse stages behind the Streamlit form,
+kept out of app.py so they can be reused and timed on their own.  Nothing
+here imports Streamlit: recoverable failures (missing metadata, a failed
+batched or delta request) degrade to a fallback and are reported in the
+result; anything else is raised as a TubeFitError for the caller.
+
+Layer 1 (metadata + comments) are independent YouTube calls, so
+fetch_video_data issues both at once and joins them before the Gemini
+stage: a cold fetch costs roughly the slower of the two calls, not their
+sum.  Every stage goes through the single-flight cache loaders.
+
+Comment sets too large for one prompt are analysed map-reduce style
+(see map_reduce): chunks run on a bounded pool, each chunk result is
+cached on its own, and the partial verdicts are merged.
+
+Several personas over one comment set (analyse_video_personas) share a
+single Gemini request, so the comment payload is sent once, not N times.
+
+Stale entries are served at once and refreshed in the background (see
+cache), incrementally where possible: for newest-first comment sets only
+comments newer than the newest cached one are fetched and merged in, and if they are a small
+share of the comment set (≤ DELTA_RECOMPUTE_RATIO) the previous verdict
+is updated from just those comments.  Larger changes are recomputed.
+"""
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from src.youtube_api import get_video_metadata, fetch_comment_batch, fetch_comments_since
+from src.gemini_ai import (
+    INPUT_TOKEN_BUDGET,
+    analyze_comments_with_gemini, analyze_comments_for_personas,
+    analyze_comment_chunk, update_analysis_with_delta,
+)
+from src.personas import PRESET_PERSONAS
+from src.errors import YouTubeError, GeminiError
+from src.comment_filter import filter_comments
+from src.map_reduce import needs_map_reduce, chunk_comments, chunk_weight, merge_analyses
+from src.cache import (
+    load_cached_comments, load_cached_metadata,
+    load_cached_analysis, load_cached_chunk_analysis, get_stale_analysis,
+)
+
+log = logging.getLogger(__name__)
+
+_MAP_CONCURRENCY = 4                  # parallel Gemini calls per map-reduce run
+DELTA_RECOMPUTE_RATIO = 0.2           # above this share of new comments, recompute
+_MIN_DELTA_FETCH = 100                # one API page costs the same however few it holds
+MAX_PERSONAS_PER_CALL = 5             # verdicts per multi-persona request (output size)
+
+_pool     = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tubefit-fetch")
+_map_pool = ThreadPoolExecutor(max_workers=_MAP_CONCURRENCY, thread_name_prefix="tubefit-map")
+
+
+def _with_context(fn: Callable) -> Callable:
+    """
+    Carry the caller's context variables (e.g. its rate-limit priority)
+    over to whichever pool thread runs fn.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    return run
+
+
+def _comment_ref(comment: dict) -> str:
+    return comment.get("id") or comment["text"]
+
+
+def _refresh_comments(
+    video_id: str,
+    sort_order: str,
+    stale: dict,
+    fetch_since: Callable[[str, str, int], tuple[list[dict], bool]],
+) -> dict | None:
+    """
+    Bring an expired newest-first comment superset up to date by fetching
+    only comments newer than its newest one.  Returns None (→ full
+    refetch) for relevance order — a new comment's rank is unknown, and
+    appending it would leave it outside every slice and the superset out
+    of API order — when the delta is too large to trust, or when the
+    entry predates timestamps.
+    """
+    if sort_order != "time":
+        return None
+    cached = stale["comments"]
+    since  = max((c.get("published_ts", "") for c in cached if not c.get("is_reply")), default="")
+    if not since:
+        return None
+    limit = max(int(len(cached) * DELTA_RECOMPUTE_RATIO), _MIN_DELTA_FETCH)
+    new, complete = fetch_since(video_id, since, limit)
+    if not complete:
+        return None
+    known = {_comment_ref(c) for c in cached}
+    new   = [c for c in new if _comment_ref(c) not in known]
+    return {"comments": new + cached, "next_page_token": stale["next_page_token"]}
+
+
+def fetch_video_data(
+    video_id: str,
+    max_comments: int,
+    sort_order: str,
+    fetch_metadata: Callable[[str], dict | None] = get_video_metadata,
+    fetch_comments: Callable[..., tuple[list[dict], str | None]] = fetch_comment_batch,
+    fetch_since: Callable[[str, str, int], tuple[list[dict], bool]] = fetch_comments_since,
+) -> dict:
+    """
+    Layer 1: load metadata and comments concurrently (cache first).
+    fetch_metadata / fetch_comments / fetch_since can be swapped for stubs
+    in timing runs; fetch_comments(video_id, count, sort_by=, page_token=)
+    returns (comments in API order, next_page_token).  The *_age values
+    are seconds since the cached copy was stored, None when just fetched.
+    Metadata is optional: if it can't be fetched, metadata is None and the
+    reason is listed in warnings.  A failed comment fetch raises.
+    """
+    meta_future = _pool.submit(
+        _with_context(load_cached_metadata),
+        video_id, lambda: fetch_metadata(video_id),
+    )
+    comments, comments_age = load_cached_comments(
+        video_id, max_comments, sort_order,
+        lambda count, token: fetch_comments(video_id, count, sort_by=sort_order, page_token=token),
+        lambda stale: _refresh_comments(video_id, sort_order, stale, fetch_since),
+    )
+    warnings: list[str] = []
+    try:
+        video_meta, metadata_age = meta_future.result()
+    except YouTubeError as e:
+        video_meta, metadata_age = None, None
+        warnings.append(f"Could not fetch video metadata: {e}")
+    return {
+        "metadata"           : video_meta,
+        "metadata_from_cache": metadata_age is not None,
+        "metadata_age"       : metadata_age,
+        "comments"           : comments,
+        "comments_from_cache": comments_age is not None,
+        "comments_age"       : comments_age,
+        "comment_set"        : f"{sort_order}:{len(comments)}",
+        "warnings"           : warnings,
+    }
+
+
+def analyse_map_reduce(
+    persona: str,
+    comments: list[dict],
+    analyse_chunk: Callable[[list[dict], str], dict | None] = analyze_comment_chunk,
+) -> dict | None:
+    """
+    Analyse comments chunk by chunk (cached per chunk) and merge the
+    verdicts.  A failed chunk is left out of the merge rather than failing
+    the whole analysis.
+    """
+    chunks = chunk_comments(comments)
+
+    def run(chunk: list[dict]) -> dict | None:
+        try:
+            result, _ = load_cached_chunk_analysis(
+                persona, [c["text"] for c in chunk], lambda: analyse_chunk(chunk, persona),
+            )
+        except GeminiError as e:
+            log.warning("Chunk of %d comments failed: %s", len(chunk), e)
+            return None
+        return result
+
+    results = list(_map_pool.map(_with_context(run), chunks))
+    return merge_analyses([(r, chunk_weight(c)) for r, c in zip(results, chunks)])
+
+
+def analyse_video(
+    video_id: str,
+    persona: str,
+    comments: list[dict],
+    comment_set: str = "",
+    analyse: Callable[[list[dict], str], dict | None] = analyze_comments_with_gemini,
+    analyse_chunk: Callable[[list[dict], str], dict | None] = analyze_comment_chunk,
+    update: Callable[[dict, list[dict], str, int], dict | None] = update_analysis_with_delta,
+    on_match: Callable[[str], None] | None = None,
+    filtered: list[dict] | None = None,
+) -> tuple[dict | None, float | None]:
+    """
+    Layer 2: return (result, age) for one (video, persona) pair — age is
+    seconds since the verdict was cached, None if it was just computed —
+    keyed on the comment set fetch_video_data reported.  Switches to
+    map-reduce when the comments don't fit in a single prompt, and
+    updates an expired verdict from the new comments when few arrived.
+    Custom personas may be answered by a near-identical cached persona;
+    on_match is called with that persona's text when they are.  Comments
+    are filtered once per analysis (or pass filter_comments(comments) as
+    filtered if the caller already has it); the basis stays the unfiltered
+    comment refs.
+    """
+    basis = [_comment_ref(c) for c in comments]
+
+    def run() -> dict | None:
+        unique = filter_comments(filtered if filtered is not None else comments)
+        large  = needs_map_reduce(unique, INPUT_TOKEN_BUDGET)
+        stale = get_stale_analysis(video_id, persona, comment_set)
+        if stale is not None:
+            previous, previous_basis = stale
+            seen = set(previous_basis)
+            new  = [c for c in comments if _comment_ref(c) not in seen]
+            if not new:
+                return previous
+            if not large and len(new) <= DELTA_RECOMPUTE_RATIO * len(comments):
+                try:
+                    updated = update(previous, new, persona, len(previous_basis))
+                except GeminiError as e:
+                    log.warning("Delta update failed, recomputing: %s", e)
+                    updated = None
+                if updated:
+                    return updated
+        if large:                     # unchanged chunks are cache hits anyway
+            return analyse_map_reduce(persona, unique, analyse_chunk)
+        return analyse(unique, persona)
+
+    return load_cached_analysis(
+        video_id, persona, run, comment_set, basis,
+        custom=persona not in PRESET_PERSONAS, on_match=on_match,
+    )
+
+
+class _PersonaBatch:
+    """
+    Stand-in for analyse(comments, persona) that answers every persona in
+    `personas` from shared multi-persona requests, made on first use.
+    Personas outside the batch, or left unanswered by a failed request,
+    fall back to a single-persona call.
+    """
+
+    def __init__(self, personas: list[str], analyse_many: Callable, analyse: Callable):
+        self.personas     = personas
+        self.analyse_many = analyse_many
+        self.analyse      = analyse
+        self.results: dict[str, dict] | None = None
+        self.lock         = threading.Lock()
+
+    def __call__(self, comments: list[dict], persona: str) -> dict | None:
+        with self.lock:
+            if self.results is None and persona in self.personas:
+                self.results = {}
+                for i in range(0, len(self.personas), MAX_PERSONAS_PER_CALL):
+                    group = self.personas[i:i + MAX_PERSONAS_PER_CALL]
+                    try:
+                        self.results.update(self.analyse_many(comments, group) or {})
+                    except GeminiError as e:
+                        log.warning("Multi-persona request failed, analysing singly: %s", e)
+        result = (self.results or {}).get(persona)
+        return result if result is not None else self.analyse(comments, persona)
+
+
+def analyse_video_personas(
+    video_id: str,
+    personas: list[str],
+    comments: list[dict],
+    comment_set: str = "",
+    analyse: Callable[[list[dict], str], dict | None] = analyze_comments_with_gemini,
+    analyse_many: Callable[[list[dict], list[str]], dict | None] = analyze_comments_for_personas,
+    **kwargs,
+) -> dict[str, tuple[dict | None, float | None]]:
+    """
+    Layer 2 for several personas over one comment set: {persona: (result,
+    age)}.  Personas with nothing cached are analysed together — the
+    comments go to Gemini once per MAX_PERSONAS_PER_CALL personas rather
+    than once per persona — and each verdict is cached under its own
+    (video, persona) key, exactly as analyse_video would have.  Cached,
+    stale-updatable and map-reduce-sized cases go through analyse_video
+    unchanged.
+    """
+    personas = list(dict.fromkeys(personas))
+    missing  = [p for p in personas if get_stale_analysis(video_id, p, comment_set) is None]
+    batch    = _PersonaBatch(missing, analyse_many, analyse)
+    return {
+        p: analyse_video(video_id, p, comments, comment_set, analyse=batch, **kwargs)
+        for p in personas
+    }
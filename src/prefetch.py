@@ -0,0 +1,108 @@
+"""
+Background prefetch of the preset persona analyses.
+
+When a video's comments are first fetched, the presets nobody has asked
+for yet are analysed off the request path, so switching the persona
+dropdown on the same video is an instant cache hit.  Prefetch is
+optional (PREFETCH_PERSONAS) and kept at low priority:
+
+  - one worker thread per process, so at most one prefetch request is in
+    flight next to the users' own requests, and the rate limiter serves
+    those first (background priority);
+  - all presets for a video share one multi-persona Gemini request, and
+    comment sets too large for one prompt (map-reduce) are skipped;
+  - a global budget of PREFETCH_MAX_PER_HOUR Gemini requests per process
+    — work beyond it is dropped, never queued.
+"""
+import math
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import PREFETCH_PERSONAS, PREFETCH_MAX_PER_HOUR
+from src.personas import PRESET_PERSONAS
+from src.rate_limit import background_priority
+from src.cache import get_stale_analysis
+from src.gemini_ai import INPUT_TOKEN_BUDGET
+from src.comment_filter import filter_comments
+from src.map_reduce import needs_map_reduce
+from src.pipeline import MAX_PERSONAS_PER_CALL, analyse_video_personas
+
+_WINDOW = 60 * 60                     # budget window (seconds)
+
+_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tubefit-prefetch")
+_scheduled: set[tuple[str, str]] = set()
+_scheduled_lock = threading.Lock()
+
+
+class _Budget:
+    """Sliding-window request budget: at most `limit` requests per `window`."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit  = limit
+        self.window = window
+        self.spent: deque[float] = deque()
+        self.lock   = threading.Lock()
+
+    def take(self, n: int) -> bool:
+        """Reserve n requests if the window still has room for them."""
+        now = time.monotonic()
+        with self.lock:
+            while self.spent and now - self.spent[0] > self.window:
+                self.spent.popleft()
+            if len(self.spent) + n > self.limit:
+                return False
+            self.spent.extend([now] * n)
+            return True
+
+    def remaining(self) -> int:
+        now = time.monotonic()
+        with self.lock:
+            return self.limit - sum(1 for t in self.spent if now - t <= self.window)
+
+
+_budget = _Budget(PREFETCH_MAX_PER_HOUR, _WINDOW)
+
+
+def _prefetch(video_id: str, comments: list[dict], comment_set: str, personas: list[str]) -> None:
+    try:
+        missing = [p for p in personas if get_stale_analysis(video_id, p, comment_set) is None]
+        if not missing:
+            return
+        unique = filter_comments(comments)
+        if needs_map_reduce(unique, INPUT_TOKEN_BUDGET):
+            return
+        if _budget.take(math.ceil(len(missing) / MAX_PERSONAS_PER_CALL)):
+            with background_priority():
+                analyse_video_personas(video_id, missing, comments, comment_set, filtered=unique)
+    except Exception:
+        pass                          # best effort — users analyse on demand
+    finally:
+        with _scheduled_lock:
+            _scheduled.discard((video_id, comment_set))
+
+
+def schedule_prefetch(
+    video_id: str, comments: list[dict], comment_set: str, skip: str = "",
+) -> bool:
+    """
+    Queue background analyses of the preset personas (except skip, the
+    one the user just ran) for this comment set.  Returns False when
+    prefetch is disabled or already queued.  The map-reduce size check
+    filters the comments, so it runs on the prefetch thread, not here.
+    """
+    if not PREFETCH_PERSONAS or not comments:
+        return False
+    with _scheduled_lock:
+        if (video_id, comment_set) in _scheduled:
+            return False
+        _scheduled.add((video_id, comment_set))
+    personas = [p for p in PRESET_PERSONAS if p != skip]
+    _pool.submit(_prefetch, video_id, comments, comment_set, personas)
+    return True
+
+
+def prefetch_budget_remaining() -> int:
+    """Prefetch Gemini requests left in the current window."""
+    return _budget.remaining()
@@ -0,0 +1,149 @@
+"""
+Token-bucket rate limiting for the upstream APIs, with priorities.
+
+Every YouTube request spends quota units (commentThreads.list and
+videos.list cost 1 each against YOUTUBE_DAILY_UNITS per day) and every
+Gemini request spends one request plus its estimated tokens against
+GEMINI_RPM / GEMINI_TPM.  Each limit is a token bucket that refills
+continuously at its per-second rate.  The YouTube bucket holds only
+YOUTUBE_BURST_UNITS, not the whole day's quota, and refills at
+YOUTUBE_DAILY_UNITS per day: any 24 h window spends at most the daily
+quota plus one burst, and a restart starts with one burst, not a fresh
+day.  Every attempt is charged, retries included (see resilience).
+
+Callers wait in a priority queue when a bucket is short: interactive
+requests (a user pressing Analyse) always go before background work
+(prefetch, batch runs, stale-while-revalidate refreshes), which runs
+inside background_priority().  A caller that would wait longer than
+RATE_LIMIT_MAX_WAIT gets RateLimitError instead of hanging.
+
+Buckets are per process; with several server processes, divide the
+budgets between them.  A limit of 0 disables that bucket.
+"""
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator
+
+from src.config import (
+    YOUTUBE_DAILY_UNITS, YOUTUBE_BURST_UNITS, GEMINI_RPM, GEMINI_TPM, RATE_LIMIT_MAX_WAIT,
+)
+from src.errors import RateLimitError
+
+INTERACTIVE = 0
+BACKGROUND  = 1
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("priority", default=INTERACTIVE)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Run the enclosed upstream calls behind any interactive ones."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """capacity tokens, refilled continuously at rate tokens per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate     = rate
+        self.tokens   = capacity
+        self.updated  = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, cost: float) -> float:
+        """Seconds until cost tokens are available (0 if they are now)."""
+        return max(0.0, (min(cost, self.capacity) - self.tokens) / self.rate)
+
+
+class Limiter:
+    """Named set of buckets that calls draw from together, in priority order."""
+
+    def __init__(self, name: str, buckets: dict[str, TokenBucket]):
+        self.name    = name
+        self.buckets = buckets
+        self.waiters: list[tuple[int, int]] = []
+        self.seq     = itertools.count()
+        self.cond    = threading.Condition()
+
+    def acquire(self, max_wait: float = RATE_LIMIT_MAX_WAIT, **costs: float) -> None:
+        """
+        Take costs (bucket name → amount) from the buckets, waiting behind
+        higher-priority and earlier callers.  Raises RateLimitError if
+        that would take longer than max_wait seconds.
+        """
+        costs  = {k: v for k, v in costs.items() if k in self.buckets}
+        ticket = (_priority.get(), next(self.seq))
+        deadline = time.monotonic() + max_wait
+        with self.cond:
+            heapq.heappush(self.waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    for bucket in self.buckets.values():
+                        bucket.refill(now)
+                    wait = max(
+                        (self.buckets[k].wait_for(v) for k, v in costs.items()), default=0.0,
+                    )
+                    if self.waiters[0] == ticket and wait == 0:
+                        for k, v in costs.items():
+                            self.buckets[k].tokens -= min(v, self.buckets[k].capacity)
+                        return
+                    if now + wait > deadline:
+                        raise RateLimitError(
+                            f"{self.name} rate limit reached — try again in {wait:.0f} s"
+                        )
+                    self.cond.wait(min(max(wait, 0.05), deadline - now))
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+                self.cond.notify_all()
+
+    def remaining(self) -> dict[str, int]:
+        with self.cond:
+            now = time.monotonic()
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+            return {k: int(b.tokens) for k, b in self.buckets.items()}
+
+
+def _buckets(**limits: tuple[float, float, float]) -> dict[str, TokenBucket]:
+    """
+    name=(limit, period in seconds, burst): refills limit per period and
+    holds at most burst (the whole limit if 0); zero limits are skipped.
+    """
+    return {
+        k: TokenBucket(min(burst or limit, limit), limit / period)
+        for k, (limit, period, burst) in limits.items() if limit > 0
+    }
+
+
+_limiters = {
+    "youtube": Limiter(
+        "YouTube", _buckets(units=(YOUTUBE_DAILY_UNITS, 24 * 60 * 60, YOUTUBE_BURST_UNITS)),
+    ),
+    "gemini" : Limiter(
+        "Gemini", _buckets(requests=(GEMINI_RPM, 60, 0), tokens=(GEMINI_TPM, 60, 0)),
+    ),
+}
+
+
+def acquire(dependency: str, **costs: float) -> None:
+    """Spend costs from dependency's budget, e.g. acquire("youtube", units=1)."""
+    _limiters[dependency].acquire(**costs)
+
+
+def remaining_budget() -> dict[str, dict[str, int]]:
+    """Tokens left right now in every bucket, per dependency."""
+    return {name: limiter.remaining() for name, limiter in _limiters.items()}
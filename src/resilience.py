@@ -0,0 +1,166 @@
+"""
+Retry, backoff and circuit breaking for the upstream APIs (YouTube, Gemini).
+
+with_resilience(dependency, fn) runs fn() and, on a transient failure —
+HTTP 408 / 429 / 5xx, a YouTube rate-limit 403, a timeout or a dropped
+connection — retries it up to RETRY_MAX_ATTEMPTS times with capped
+exponential backoff and full jitter (sleep uniformly in
+[0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY · 2^n)]), so a brief 429 or 503
+no longer fails a whole analysis.  Other errors are raised at once.
+
+Each dependency has a circuit breaker.  After BREAKER_FAILURES transient
+failures in a row it opens and every call fails fast with
+CircuitOpenError instead of waiting on timeouts; after BREAKER_RESET
+seconds one trial call is let through (half-open) and its outcome closes
+or re-opens the circuit.
+
+An optional charge() runs before every attempt, retries included, so a
+rate limiter is billed for each request actually sent.
+
+Per-call timeouts are set where each client is built (YOUTUBE_TIMEOUT,
+GEMINI_TIMEOUT); a timeout counts as a transient failure here.  Only
+attribute lookups are used to classify errors, so this module imports
+neither client library.
+"""
+import time
+import random
+import threading
+from typing import Callable, TypeVar
+
+from src.config import (
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    BREAKER_FAILURES, BREAKER_RESET,
+)
+from src.errors import CircuitOpenError
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def _status(exc: Exception) -> int | None:
+    resp = getattr(exc, "resp", None)            # googleapiclient HttpError
+    if resp is not None and getattr(resp, "status", None):
+        return int(resp.status)
+    code = getattr(exc, "code", None)            # google.api_core exceptions
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(exc: Exception) -> bool:
+    """True for failures worth retrying: throttling, 5xx, timeouts, resets."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = _status(exc)
+    if status == 403:                            # YouTube signals throttling as 403
+        return "ratelimitexceeded" in str(exc).lower()
+    return status in RETRYABLE_STATUS
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed → open → half-open → closed."""
+
+    def __init__(self, name: str, failures: int = BREAKER_FAILURES, reset: float = BREAKER_RESET):
+        self.name       = name
+        self.threshold  = failures
+        self.reset      = reset
+        self.failures   = 0
+        self.opened_at: float | None = None
+        self.probing    = False
+        self.lock       = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def before(self) -> None:
+        """Raise CircuitOpenError unless a call may go ahead now."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            wait = self.reset - (time.monotonic() - self.opened_at)
+            if wait > 0 or self.probing:
+                raise CircuitOpenError(
+                    f"{self.name} is unavailable — not retrying for {max(wait, 0):.0f} s"
+                )
+            self.probing = True                  # let exactly one trial call through
+
+    def cancel(self) -> None:
+        """Give back a trial call that was never made."""
+        with self.lock:
+            self.probing = False
+
+    def success(self) -> None:
+        with self.lock:
+            self.failures, self.opened_at, self.probing = 0, None, False
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(dependency)
+        if breaker is None:
+            breaker = _breakers[dependency] = CircuitBreaker(dependency)
+        return breaker
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter delay before retry number attempt (0-based)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def with_resilience(
+    dependency: str,
+    fn: Callable[[], T],
+    attempts: int = RETRY_MAX_ATTEMPTS,
+    charge: Callable[[], None] | None = None,
+) -> T:
+    """
+    Call fn() through dependency's circuit breaker, retrying transient
+    failures with backoff; charge() is called before each attempt and may
+    raise (e.g. RateLimitError) to stop.  Raises CircuitOpenError when the
+    circuit is open, otherwise the last error once attempts run out.
+    """
+    breaker = get_breaker(dependency)
+    attempt = 0
+    while True:
+        breaker.before()
+        if charge is not None:
+            try:
+                charge()
+            except BaseException:
+                breaker.cancel()
+                raise
+        try:
+            value = fn()
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.success()                # the dependency answered
+                raise
+            breaker.failure()
+            attempt += 1
+            if attempt >= attempts:
+                raise
+            time.sleep(backoff_delay(attempt - 1))
+        else:
+            breaker.success()
+            return value
+
+
+def breaker_states() -> dict[str, str]:
+    """Current circuit state per dependency, for status displays."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.state for b in breakers}
@@ -0,0 +1,154 @@
+"""
+Fault-injection check for the retry / circuit-breaker layer — drives
+youtube_api.get_video_metadata against the stub server of
+src.youtube_client_bench with faults injected.
+
+    python -m src.resilience_bench
+
+Scenarios, run in order on one process (and so one "youtube" breaker):
+
+  retry_503   : the first RETRY_MAX_ATTEMPTS - 1 requests answer 503; the
+                call succeeds on the last attempt
+  retry_429   : the first request answers 429; the call succeeds on the second
+  timeout     : the first request stalls past YOUTUBE_TIMEOUT and is dropped;
+                the call succeeds on the second
+  breaker     : every request answers 503; CircuitOpenError is raised once
+                BREAKER_FAILURES requests in a row have failed, and the next
+                call fails fast without a request
+  recover     : faults off; after BREAKER_RESET seconds the half-open trial
+                call succeeds and closes the circuit
+  probe_cancel: the circuit is opened again and, once half-open, the trial
+                call's charge() raises RateLimitError before any request;
+                the breaker takes the trial back (cancel), so the next call
+                still probes, succeeds and closes the circuit
+
+Each row reports the requests the stub received against the number
+expected; exits 1 unless every scenario matches.  Short retry delays, a
+1 s timeout and a 1 s BREAKER_RESET are set here unless already in the
+environment, as are the stub endpoint and a disabled YouTube rate limit.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+
+def run() -> list[dict]:
+    from src.youtube_client_bench import Faults, start_stub_server
+
+    faults = Faults()
+    server = start_stub_server(0.0, faults)
+    for name, value in {
+        "YOUTUBE_API_ENDPOINT": f"http://127.0.0.1:{server.server_address[1]}/",
+        "YOUTUBE_API_KEY"     : "bench",
+        "YOUTUBE_DAILY_UNITS" : "0",
+        "YOUTUBE_TIMEOUT"     : "1",
+        "RETRY_BASE_DELAY"    : "0.01",
+        "RETRY_MAX_DELAY"     : "0.05",
+        "BREAKER_RESET"       : "1",
+    }.items():
+        os.environ.setdefault(name, value)
+
+    from src.config import RETRY_MAX_ATTEMPTS, YOUTUBE_TIMEOUT, BREAKER_FAILURES, BREAKER_RESET
+    from src.errors import CircuitOpenError, RateLimitError
+    from src.resilience import get_breaker, with_resilience
+    from src.youtube_api import get_video_metadata
+
+    breaker = get_breaker("youtube")
+
+    def call() -> str:
+        """Outcome of one metadata lookup: "ok" or the exception's type name."""
+        try:
+            get_video_metadata("stubvideo01")     # the stub answers any id
+            return "ok"
+        except Exception as e:
+            return type(e).__name__
+
+    def row(scenario: str, expected: int, outcome: str, want: str, start: float, check: bool = True) -> dict:
+        return {
+            "scenario": scenario,
+            "requests": faults.requests,
+            "expected": expected,
+            "outcome" : outcome,
+            "state"   : breaker.state,
+            "seconds" : round(time.perf_counter() - start, 3),
+            "ok"      : faults.requests == expected and outcome == want and check,
+        }
+
+    def open_circuit() -> str:
+        """Fail every request until the breaker opens (or plainly can't)."""
+        faults.set(fail=-1, status=503)
+        for _ in range(BREAKER_FAILURES + 1):
+            outcome = call()
+            if outcome == CircuitOpenError.__name__:
+                break
+        return outcome
+
+    rows = []
+    try:
+        call()                                    # build the client and connect
+        for scenario, status, fail, stall in (
+            ("retry_503", 503, RETRY_MAX_ATTEMPTS - 1, 0.0),
+            ("retry_429", 429, 1, 0.0),
+            ("timeout", 503, 1, YOUTUBE_TIMEOUT + 0.5),
+        ):
+            breaker.success()
+            faults.set(fail=fail, status=status, stall=stall)
+            start = time.perf_counter()
+            rows.append(row(scenario, fail + 1, call(), "ok", start))
+
+        breaker.success()
+        start   = time.perf_counter()
+        outcome = open_circuit()
+        sent    = faults.requests
+        fast    = call()                          # must not reach the stub
+        rows.append(row(
+            "breaker", BREAKER_FAILURES, outcome, "CircuitOpenError", start,
+            check=sent == faults.requests and fast == outcome,
+        ))
+
+        faults.set()
+        start = time.perf_counter()
+        time.sleep(BREAKER_RESET)
+        outcome = call()
+        rows.append(row("recover", 1, outcome, "ok", start, check=breaker.state == "closed"))
+
+        open_circuit()
+        faults.set()
+        start = time.perf_counter()
+        time.sleep(BREAKER_RESET)
+
+        def refuse() -> None:
+            raise RateLimitError("injected: budget exhausted")
+
+        try:
+            with_resilience("youtube", lambda: None, charge=refuse)
+            refused = "ok"
+        except Exception as e:
+            refused = type(e).__name__
+        outcome = call()
+        rows.append(row(
+            "probe_cancel", 1, outcome, "ok", start,
+            check=refused == "RateLimitError" and breaker.state == "closed",
+        ))
+        return rows
+    finally:
+        server.shutdown()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.resilience_bench",
+        description="Retries, timeouts and the circuit breaker against a fault-injecting stub server.",
+    )
+    parser.parse_args(argv)
+
+    rows = run()
+    for row in rows:
+        print(json.dumps(row))
+    return 0 if all(r["ok"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
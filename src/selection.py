@@ -0,0 +1,71 @@
+"""
+Comment selection — decides which comments go into the Gemini prompt.
+
+Rather than joining every comment and slicing the text at a character
+limit (which cuts mid-comment and silently drops whatever came last),
+comments are pre-filtered (spam and near-duplicates, see comment_filter),
+ranked by likes, recency and length, and packed whole until the token
+budget is full.
+"""
+import math
+from datetime import date
+
+from src.comment_filter import filter_comments
+
+CHARS_PER_TOKEN = 4                   # rough average for English text
+SEPARATOR       = "\n---\n"
+
+# Ranking weights
+_W_LIKES   = 1.0
+_W_RECENCY = 1.5
+_W_LENGTH  = 1.0
+_RECENCY_HALF_LIFE_DAYS = 90
+_IDEAL_LENGTH = 300                   # chars; longer adds no extra credit
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate — good enough for budgeting, no tokenizer call."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _parse_date(value: str) -> date | None:
+    try:
+        return date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _score(comment: dict, newest: date | None) -> float:
+    likes = math.log1p(max(comment.get("likes", 0), 0))
+    published = _parse_date(comment.get("published_at", ""))
+    if newest and published:
+        age_days = max((newest - published).days, 0)
+        recency  = 0.5 ** (age_days / _RECENCY_HALF_LIFE_DAYS)
+    else:
+        recency = 0.0
+    length = min(len(comment.get("text", "")), _IDEAL_LENGTH) / _IDEAL_LENGTH
+    return _W_LIKES * likes + _W_RECENCY * recency + _W_LENGTH * length
+
+
+def select_comments(comments: list[dict], token_budget: int) -> list[dict]:
+    """
+    Return the highest-ranked whole comments that fit in token_budget,
+    best first.  Spam and near-duplicates are filtered out first, and
+    collapsed duplicates rank with their combined likes.  Comments too
+    long for the remaining budget are skipped in favour of shorter ones
+    further down the ranking.
+    """
+    unique = filter_comments(comments)
+    dates  = [d for d in (_parse_date(c.get("published_at", "")) for c in unique) if d]
+    newest = max(dates) if dates else None
+    ranked = sorted(unique, key=lambda c: _score(c, newest), reverse=True)
+
+    selected, used = [], 0
+    sep_tokens = estimate_tokens(SEPARATOR)
+    for c in ranked:
+        cost = estimate_tokens(c["text"]) + sep_tokens
+        if used + cost > token_budget:
+            continue
+        selected.append(c)
+        used += cost
+    return selected
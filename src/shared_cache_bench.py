@@ -0,0 +1,78 @@
+"""
+Two-process test of the shared cache backend — one CACHE_PATH, two
+worker processes, upstream calls counted in each.
+
+    python -m src.shared_cache_bench [-n 20] [--latency 0.05]
+
+  sequential : worker A serves -n videos, then worker B serves the same
+               ones.  B must make no upstream calls — every result A
+               stored is a hit for B.
+  concurrent : A and B start together on an empty cache.  single-flight
+               is per process, so simultaneous misses in different
+               workers may each call upstream; the counts are reported,
+               and only bounded (at most one call per video per worker).
+
+Workers are src.warm_start_bench children (stub upstream calls sleeping
+--latency seconds) run with CACHE_BACKEND=shared.  Exits 1 if an
+assertion fails.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+
+def _start(path: str, videos: int, latency: float) -> subprocess.Popen:
+    env = {**os.environ, "CACHE_BACKEND": "shared", "CACHE_PATH": path}
+    return subprocess.Popen(
+        [sys.executable, "-m", "src.warm_start_bench", "--child",
+         "-n", str(videos), "--latency", str(latency)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env,
+    )
+
+
+def _calls(proc: subprocess.Popen) -> int:
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(err.strip() or "worker failed")
+    return sum(json.loads(out.strip().splitlines()[-1])["upstream_calls"].values())
+
+
+def run(videos: int = 20, latency: float = 0.05) -> list[dict]:
+    """Both scenarios; one dict per scenario with per-worker call counts."""
+    expected = 2 * videos                      # one comment fetch + one analysis each
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sequential.db")
+        a = _calls(_start(path, videos, latency))
+        b = _calls(_start(path, videos, latency))
+        rows.append({"scenario": "sequential", "worker_a": a, "worker_b": b,
+                     "ok": a == expected and b == 0})
+
+        path = os.path.join(tmp, "concurrent.db")
+        procs = [_start(path, videos, latency) for _ in range(2)]
+        a, b  = (_calls(p) for p in procs)
+        rows.append({"scenario": "concurrent", "worker_a": a, "worker_b": b,
+                     "ok": expected <= a + b <= 2 * expected})
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.shared_cache_bench",
+        description="Run two worker processes on one shared cache and count upstream calls.",
+    )
+    parser.add_argument("-n", "--videos", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per upstream call")
+    args = parser.parse_args(argv)
+
+    rows = run(args.videos, args.latency)
+    for row in rows:
+        print(json.dumps(row))
+    return 0 if all(r["ok"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
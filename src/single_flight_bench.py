@@ -0,0 +1,77 @@
+"""
+Load test for single-flight loading — N concurrent identical requests
+must turn into exactly one upstream call per cache layer.
+
+    python -m src.single_flight_bench [-c 50] [--latency 0.3]
+
+-c threads are released together (a barrier) on one fresh video and each
+loads its comments, metadata and analysis through the load_cached_*
+helpers, as a session of the app would.  The stub upstream calls sleep
+--latency seconds, long enough for every thread to miss before the first
+result is stored.  Reports each loader's call count and the wall time;
+exits 1 unless every loader ran exactly once.
+"""
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import load_cached_comments, load_cached_metadata, load_cached_analysis
+
+
+def run(concurrency: int = 50, latency: float = 0.3) -> dict:
+    video_id = f"bench-{uuid.uuid4().hex[:8]}"  # never cached before, in any backend
+    calls    = {"comments": 0, "metadata": 0, "analysis": 0}
+    lock     = threading.Lock()
+    barrier  = threading.Barrier(concurrency)
+
+    def upstream(layer: str, value):
+        with lock:
+            calls[layer] += 1
+        time.sleep(latency)
+        return value
+
+    def request(_: int) -> None:
+        barrier.wait()
+        comments, _ = load_cached_comments(
+            video_id, 100, "relevance",
+            lambda count, token: upstream(
+                "comments", ([{"id": str(i), "text": f"c{i}", "likes": i} for i in range(count)], None),
+            ),
+        )
+        load_cached_metadata(video_id, lambda: upstream("metadata", {"title": video_id}))
+        load_cached_analysis(
+            video_id, "persona", lambda: upstream("analysis", {"verdict": "Suitable"}),
+            "relevance:100", [c["id"] for c in comments],
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(request, range(concurrency)))
+    return {
+        "concurrency": concurrency,
+        "seconds"    : round(time.perf_counter() - start, 3),
+        "calls"      : calls,
+        "ok"         : all(n == 1 for n in calls.values()),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.single_flight_bench",
+        description="N concurrent identical requests → one upstream call per layer.",
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per upstream call")
+    args = parser.parse_args(argv)
+
+    result = run(args.concurrency, args.latency)
+    print(json.dumps(result))
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Startup benchmark — time from process start to the first rendered page.
+
+    python -m src.startup_bench [-r 5] [--app app.py]
+
+Each run starts a fresh interpreter that renders app.py once through
+streamlit.testing.  That is the same script run a browser's first visit
+triggers, minus the websocket.  The time is measured from the parent
+launching the process to the child reporting the finished render, so it
+covers interpreter start-up, every import on the render path and the
+first script run.
+
+Each run also lists which of HEAVY_MODULES were loaded by then.  A change
+that pulls one of them back onto the render path shows up here.
+Streamlit may import pandas itself, so its presence alone isn't a
+regression.  With GEMINI_WARMUP on, the warm-up thread may already have
+imported google.generativeai off the render path; set
+GEMINI_WARMUP=false to measure without it.
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+HEAVY_MODULES = ("pandas", "googleapiclient", "google.generativeai", "httplib2")
+
+_CHILD = """
+import sys, json
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120).run()
+print(json.dumps({{
+    "errors": [e.message for e in at.exception],
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure(app: str = "app.py") -> dict:
+    """One cold start: {"seconds", "errors", "loaded"} for a fresh process."""
+    start = time.perf_counter()
+    proc  = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(app=app, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True,
+    )
+    seconds = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "benchmark failed")
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {"seconds": round(seconds, 3), **report}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.startup_bench",
+        description="Time process start → first rendered page of the Streamlit app.",
+    )
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    parser.add_argument("--app", default="app.py")
+    args = parser.parse_args(argv)
+
+    runs = [measure(args.app) for _ in range(args.runs)]
+    for i, run in enumerate(runs, 1):
+        print(json.dumps({"run": i, **run}))
+    times = [r["seconds"] for r in runs]
+    print(json.dumps({
+        "median_s": round(statistics.median(times), 3),
+        "min_s"   : min(times),
+        "max_s"   : max(times),
+    }))
+    return 1 if any(r["errors"] for r in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
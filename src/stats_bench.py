@@ -0,0 +1,62 @@
+"""
+Micro-benchmark for cache_stats() — the call behind the sidebar on every
+Streamlit rerun — as the store grows to 100k entries.
+
+    python -m src.stats_bench [--sizes 1000 10000 100000] [-r 2000]
+
+The store is filled with small entries spread over the comment, metadata
+and analysis namespaces, and cache_stats() is timed -r times at each size.
+Every figure it returns comes from counters, so the cost per call should
+stay flat; exits 1 if the largest size costs more than --max-ratio times
+the smallest.  Runs on the memory backend with CACHE_MAX_ENTRIES raised so
+nothing is evicted (both set here unless already in the environment).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+
+def run(sizes: list[int], repeats: int = 2000) -> list[dict]:
+    os.environ.setdefault("CACHE_BACKEND", "memory")
+    os.environ.setdefault("CACHE_MAX_ENTRIES", str(max(sizes) * 2))
+    os.environ.setdefault("CACHE_MAX_BYTES", str(4 * 1024 ** 3))
+    from src.cache import _set, _make_key, cache_stats
+
+    namespaces = ("comments", "metadata", "analysis")
+    rows, filled = [], 0
+    for size in sorted(sizes):
+        for i in range(filled, size):
+            ns = namespaces[i % len(namespaces)]
+            _set(ns, _make_key(ns, f"video{i}"), {"n": i}, 3600)
+        filled = size
+        stats = cache_stats()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            cache_stats()
+        per_call = (time.perf_counter() - start) / repeats
+        rows.append({"entries": stats["total"], "us_per_call": round(per_call * 1e6, 2)})
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.stats_bench",
+        description="Time cache_stats() as the cache grows.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("-r", "--repeats", type=int, default=2000)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    rows = run(args.sizes, args.repeats)
+    for row in rows:
+        print(json.dumps(row))
+    ratio = rows[-1]["us_per_call"] / max(rows[0]["us_per_call"], 1e-9)
+    print(json.dumps({"ratio_largest_to_smallest": round(ratio, 2)}))
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 """
-Utility helpers: URL parsing, number formatting, report generation.
+Utility helpers: URL parsing, number / age formatting, report generation.
 """
 import re
 from datetime import datetime
@@ -25,6 +25,15 @@ def format_number(n: int) -> str:
     return str(n)
 
 
+def format_age(seconds: float) -> str:
+    """Format a cache entry's age as "just now" / "12 min ago" / "3 h ago"."""
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    return f"{int(seconds // 3600)} h ago"
+
+
 def generate_report_markdown(
     video_meta: dict | None,
     result: dict,
@@ -0,0 +1,100 @@
+"""
+Warm-start benchmark — the first requests after a restart, with a cold
+(memory) cache and with a persistent (SQLite) one.
+
+    python -m src.warm_start_bench [-n 50] [--latency 0.2]
+
+For each backend a fresh process first serves -n videos (comments plus one
+analysis each) through the cache loaders, then exits.  A second fresh
+process — the "restarted" worker — serves the same requests again.  The
+upstream calls are stubs that sleep --latency seconds, so the figures are
+the cache's alone; each row reports the restarted process's wall time and
+how many upstream calls it still had to make.  The backend is chosen via
+CACHE_BACKEND / CACHE_PATH in the environment, so .streamlit/secrets.toml
+must not set them.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+
+def serve_videos(videos: int, latency: float) -> dict:
+    """Serve every video once in this process; time it and count upstream calls."""
+    from src.cache import load_cached_comments, load_cached_analysis
+
+    calls = {"youtube": 0, "gemini": 0}
+
+    def fetch(video_id: str):
+        def run(count: int, token: str | None) -> tuple[list[dict], None]:
+            calls["youtube"] += 1
+            time.sleep(latency)
+            return [
+                {"id": f"{video_id}-{i}", "text": f"comment {i}", "likes": i}
+                for i in range(count)
+            ], None
+        return run
+
+    def analyse() -> dict:
+        calls["gemini"] += 1
+        time.sleep(latency)
+        return {"verdict": "Suitable", "confidence_score": 80}
+
+    start = time.perf_counter()
+    for i in range(videos):
+        video_id = f"video{i:05d}"
+        comments, _ = load_cached_comments(video_id, 100, "relevance", fetch(video_id))
+        load_cached_analysis(
+            video_id, "persona", analyse, "relevance:100", [c["id"] for c in comments],
+        )
+    return {"seconds": round(time.perf_counter() - start, 3), "upstream_calls": calls}
+
+
+def _child(backend: str, path: str, videos: int, latency: float) -> dict:
+    env  = {**os.environ, "CACHE_BACKEND": backend, "CACHE_PATH": path}
+    proc = subprocess.run(
+        [sys.executable, "-m", "src.warm_start_bench", "--child",
+         "-n", str(videos), "--latency", str(latency)],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "benchmark child failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(backend: str, videos: int = 50, latency: float = 0.2) -> dict:
+    """Fill the cache in one process, then time a restarted process on it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        first = _child(backend, path, videos, latency)
+        after = _child(backend, path, videos, latency)
+    return {"backend": backend, "first_s": first["seconds"], **after}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.warm_start_bench",
+        description="Compare the first requests after a restart: memory vs SQLite cache.",
+    )
+    parser.add_argument("-n", "--videos", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per upstream call")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(serve_videos(args.videos, args.latency)))
+        return 0
+
+    rows = [measure(b, args.videos, args.latency) for b in ("memory", "sqlite")]
+    for row in rows:
+        print(json.dumps(row))
+    cold, warm = rows
+    print(json.dumps({"speedup": round(cold["seconds"] / max(warm["seconds"], 1e-9), 1)}))
+    return 1 if sum(warm["upstream_calls"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
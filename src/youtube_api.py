@@ -1,81 +1,297 @@
 """
 YouTube Data API v3 helpers.
-Fetches video metadata and top-level comments.
+Fetches video metadata and comments (paginated, optionally with replies).
+
+One discovery resource is built per process from the discovery document
+bundled with google-api-python-client (no network fetch) and shared by
+every session.  httplib2 connections are not thread-safe, so each thread
+executes requests over its own keep-alive Http object instead of opening
+a fresh connection per call.  Every request has a YOUTUBE_TIMEOUT and goes
+through the shared retry / circuit-breaker layer (see resilience) and the
+quota-aware rate limiter (see rate_limit).  googleapiclient and httplib2
+are imported on first use, not at import, to keep them off the app's
+start-up path.
 """
-import streamlit as st
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator
 
-from src.config import YOUTUBE_API_KEY
+from src.config import YOUTUBE_API_KEY, YOUTUBE_API_ENDPOINT, YOUTUBE_TIMEOUT
+from src.resilience import with_resilience
+from src.rate_limit import acquire
+from src.errors import TubeFitError, YouTubeError, CommentsDisabledError
+from src.selection import SEPARATOR, estimate_tokens
 
+if TYPE_CHECKING:
+    import httplib2
 
-def _build_client():
-    return build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+log = logging.getLogger(__name__)
 
+_PAGE_SIZE = 100                      # API maximum for commentThreads.list
+_METADATA_BATCH = 50                  # API maximum ids per videos.list call
+
+_client = None
+_client_lock = threading.Lock()
+_http_local = threading.local()
+_page_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tubefit-pages")
+
+
+def _get_client():
+    """Return the process-wide YouTube resource, building it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from googleapiclient.discovery import build
+                _client = build(
+                    "youtube", "v3",
+                    developerKey=YOUTUBE_API_KEY,
+                    static_discovery=True,
+                    cache_discovery=False,
+                    client_options=(
+                        {"api_endpoint": YOUTUBE_API_ENDPOINT} if YOUTUBE_API_ENDPOINT else None
+                    ),
+                )
+    return _client
+
+
+def _http() -> "httplib2.Http":
+    """Return this thread's pooled keep-alive HTTP transport."""
+    http = getattr(_http_local, "http", None)
+    if http is None:
+        import httplib2
+        http = _http_local.http = httplib2.Http(timeout=YOUTUBE_TIMEOUT)
+    return http
+
+
+def _execute(request, units: int = 1) -> dict:
+    """
+    Execute an API request on this thread's transport, with retries, each
+    attempt spending its quota units from the rate limiter.  Failures are raised
+    as YouTubeError (CommentsDisabledError when comments are off).
+    """
+    from googleapiclient.errors import HttpError
 
-def get_video_metadata(video_id: str) -> dict | None:
-    """Return a dict of video info (title, channel, stats, thumbnail)."""
     try:
-        yt = _build_client()
-        resp = yt.videos().list(part="snippet,statistics", id=video_id).execute()
-        if not resp.get("items"):
-            return None
-        item = resp["items"][0]
-        snip = item["snippet"]
-        stats = item.get("statistics", {})
-        return {
-            "title": snip.get("title", "Unknown Title"),
-            "channel": snip.get("channelTitle", "Unknown Channel"),
-            "published_at": snip.get("publishedAt", "")[:10],
-            "thumbnail": snip.get("thumbnails", {}).get("medium", {}).get("url", ""),
-            "view_count": int(stats.get("viewCount", 0)),
-            "like_count": int(stats.get("likeCount", 0)),
-            "comment_count": int(stats.get("commentCount", 0)),
-        }
+        return with_resilience(
+            "youtube", lambda: request.execute(http=_http()),
+            charge=lambda: acquire("youtube", units=units),
+        )
     except HttpError as e:
-        st.warning(f"Could not fetch video metadata: {e}")
+        if "commentsdisabled" in str(e).lower():
+            raise CommentsDisabledError("Comments are disabled for this video.") from e
+        raise YouTubeError(f"YouTube API error: {e}") from e
+    except TubeFitError:
+        raise
     except Exception as e:
-        st.warning(f"Unexpected error fetching metadata: {e}")
-    return None
+        raise YouTubeError(f"Error calling the YouTube API: {e}") from e
 
 
-def get_youtube_comments(
+def _parse_video(item: dict) -> dict:
+    snip = item["snippet"]
+    stats = item.get("statistics", {})
+    return {
+        "title": snip.get("title", "Unknown Title"),
+        "channel": snip.get("channelTitle", "Unknown Channel"),
+        "published_at": snip.get("publishedAt", "")[:10],
+        "thumbnail": snip.get("thumbnails", {}).get("medium", {}).get("url", ""),
+        "view_count": int(stats.get("viewCount", 0)),
+        "like_count": int(stats.get("likeCount", 0)),
+        "comment_count": int(stats.get("commentCount", 0)),
+    }
+
+
+def get_video_metadata(video_id: str) -> dict | None:
+    """
+    Return a dict of video info (title, channel, stats, thumbnail), or
+    None if there is no such video.  Raises YouTubeError on failure.
+    """
+    resp = _execute(_get_client().videos().list(part="snippet,statistics", id=video_id))
+    if not resp.get("items"):
+        return None
+    return _parse_video(resp["items"][0])
+
+
+def get_videos_metadata(video_ids: list[str]) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Return ({video_id: metadata}, {video_id: error}) for many videos,
+    looked up 50 ids per videos.list call (1 quota unit each).  Unknown or
+    private videos are in neither dict; every id of a batch whose call
+    failed (after retries) maps to that failure's message.
+    """
+    yt = _get_client()
+    found, failed = {}, {}
+    for i in range(0, len(video_ids), _METADATA_BATCH):
+        batch = video_ids[i:i + _METADATA_BATCH]
+        try:
+            resp = _execute(
+                yt.videos()
+                .list(part="snippet,statistics", id=",".join(batch), maxResults=_METADATA_BATCH)
+            )
+            for item in resp.get("items", []):
+                found[item["id"]] = _parse_video(item)
+        except TubeFitError as e:
+            log.warning("Could not fetch metadata for %d videos: %s", len(batch), e)
+            failed.update(dict.fromkeys(batch, f"could not fetch metadata: {e}"))
+    return found, failed
+
+
+def _parse_comment(comment: dict, is_reply: bool = False) -> dict:
+    snippet = comment["snippet"]
+    return {
+        "id": comment.get("id", ""),
+        "text": snippet.get("textDisplay", ""),
+        "author": snippet.get("authorDisplayName", "Anonymous"),
+        "likes": snippet.get("likeCount", 0),
+        "published_at": snippet.get("publishedAt", "")[:10],
+        "published_ts": snippet.get("publishedAt", ""),
+        "is_reply": is_reply,
+    }
+
+
+def iter_comment_pages(
     video_id: str,
-    max_results: int = 100,
     sort_by: str = "relevance",
-) -> list[dict]:
+    max_comments: int = 100,
+    max_tokens: int | None = None,
+    time_budget: float | None = None,
+    include_replies: bool = False,
+    page_token: str | None = None,
+) -> Iterator[tuple[list[dict], str | None]]:
     """
-    Fetch top-level comments for a video.
-    Returns a list of dicts sorted by like count descending.
+    Yield (comments, next_page_token) one API page at a time, in API order,
+    following nextPageToken until the comment, prompt-token or time budget
+    is spent or the video runs out of threads (token None).  Tokens are
+    counted as the prompt budget counts them (selection.estimate_tokens
+    per comment plus its separator).  The next page is requested in the
+    background as soon as the current one arrives, so callers can work on
+    page N while page N+1 is in flight; fetch_comment_batch, which the
+    pipeline uses, simply collects them.  Pass a saved page_token to
+    resume where an earlier fetch stopped.
+
+    With include_replies, the replies YouTube inlines with each thread
+    (up to 5) are yielded after their top-level comment, so a page may
+    overshoot max_comments by a few replies.
+    Raises YouTubeError; see fetch_comment_batch for the catching wrapper.
     """
-    try:
-        yt = _build_client()
-        resp = (
+    yt       = _get_client()
+    part     = "snippet,replies" if include_replies else "snippet"
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+    def fetch(page_token: str | None, remaining: int) -> dict:
+        return _execute(
             yt.commentThreads()
             .list(
-                part="snippet",
+                part=part,
                 videoId=video_id,
-                maxResults=max_results,
+                maxResults=min(_PAGE_SIZE, remaining),
                 textFormat="plainText",
                 order=sort_by,
+                pageToken=page_token,
             )
-            .execute()
         )
-        comments = []
-        for item in resp.get("items", []):
-            s = item["snippet"]["topLevelComment"]["snippet"]
-            comments.append(
-                {
-                    "text": s.get("textDisplay", ""),
-                    "author": s.get("authorDisplayName", "Anonymous"),
-                    "likes": s.get("likeCount", 0),
-                    "published_at": s.get("publishedAt", "")[:10],
-                }
+
+    count, tokens = 0, 0
+    sep_tokens    = estimate_tokens(SEPARATOR)
+    # Pages are fetched on pool threads; carry over the caller's priority
+    pending = _page_pool.submit(contextvars.copy_context().run, fetch, page_token, max_comments)
+    try:
+        while pending is not None:
+            resp = pending.result()
+            page = []
+            for item in resp.get("items", []):
+                page.append(_parse_comment(item["snippet"]["topLevelComment"]))
+                if include_replies:
+                    for reply in item.get("replies", {}).get("comments", []):
+                        page.append(_parse_comment(reply, is_reply=True))
+            count += len(page)
+            tokens += sum(estimate_tokens(c["text"]) + sep_tokens for c in page)
+
+            token = resp.get("nextPageToken")
+            within_budget = (
+                count < max_comments
+                and (max_tokens is None or tokens < max_tokens)
+                and (deadline is None or time.monotonic() < deadline)
             )
-        comments.sort(key=lambda x: x["likes"], reverse=True)
-        return comments
-    except HttpError as e:
-        st.error(f"YouTube API error: {e}")
-    except Exception as e:
-        st.error(f"Error fetching comments: {e}")
-    return []
+            pending = (
+                _page_pool.submit(contextvars.copy_context().run, fetch, token, max_comments - count)
+                if token and within_budget else None
+            )
+            yield page, token
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+def get_youtube_comments(
+    video_id: str,
+    max_results: int = 100,
+    sort_by: str = "relevance",
+    include_replies: bool = False,
+) -> list[dict]:
+    """
+    Fetch up to max_results comments for a video, across as many pages as
+    needed.  Returns a list of dicts sorted by like count descending.
+    """
+    comments, _ = fetch_comment_batch(
+        video_id, max_results, sort_by=sort_by, include_replies=include_replies,
+    )
+    comments = comments[:max_results]
+    comments.sort(key=lambda x: x["likes"], reverse=True)
+    return comments
+
+
+def fetch_comment_batch(
+    video_id: str,
+    count: int,
+    sort_by: str = "relevance",
+    page_token: str | None = None,
+    include_replies: bool = False,
+) -> tuple[list[dict], str | None]:
+    """
+    Fetch about `count` comments in API order, starting at page_token.
+    Returns (comments, next_page_token); the token is None once the video
+    has no more comments, and a video with comments disabled returns
+    ([], None).  An error after some pages returns what was fetched so far
+    and the token to resume from; an error before any raises YouTubeError.
+    """
+    comments, token = [], page_token
+    try:
+        for page, token in iter_comment_pages(
+            video_id, sort_by=sort_by, max_comments=count,
+            include_replies=include_replies, page_token=page_token,
+        ):
+            comments.extend(page)
+    except CommentsDisabledError:
+        return [], None
+    except TubeFitError as e:
+        if not comments:
+            raise
+        log.warning("Comment fetch for %s stopped after %d: %s", video_id, len(comments), e)
+    return comments, token
+
+
+def fetch_comments_since(
+    video_id: str, since_ts: str, limit: int,
+) -> tuple[list[dict], bool]:
+    """
+    Fetch top-level comments published after since_ts (ISO timestamp),
+    newest first, reading pages in time order until an older comment is
+    reached.  Returns (new_comments, complete); complete is False when
+    limit ran out first or the fetch failed — the caller should then
+    refetch in full rather than trust the delta.
+    """
+    new = []
+    try:
+        for page, _ in iter_comment_pages(video_id, sort_by="time", max_comments=limit):
+            for c in page:
+                if c["published_ts"] <= since_ts:
+                    return new, True
+                new.append(c)
+        return new, len(new) < limit
+    except TubeFitError as e:
+        log.warning("Incremental comment fetch for %s failed: %s", video_id, e)
+    return new, False
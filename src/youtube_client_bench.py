@@ -0,0 +1,171 @@
+"""
+Per-request latency of YouTube calls against a local stub server: a
+client rebuilt for every call (the old behaviour) vs the process-wide
+client with a pooled keep-alive transport.
+
+    python -m src.youtube_client_bench [-n 100] [--connect-delay 0.02]
+
+The stub server answers videos.list on 127.0.0.1 over HTTP/1.1 and sleeps
+--connect-delay seconds once per new connection, standing in for the TCP
++ TLS handshake a real client pays to reach googleapis.com.
+
+  rebuild : discovery.build() (static discovery document) and a fresh
+            httplib2.Http for every request — a new connection each time
+  pooled  : youtube_api.get_video_metadata(), i.e. the shared resource,
+            this thread's keep-alive transport, retries and rate limiter
+
+start_stub_server can also inject faults (see Faults): the resilience
+check (src.resilience_bench) drives get_video_metadata through it.
+
+Requires google-api-python-client and httplib2.  YOUTUBE_API_ENDPOINT is
+pointed at the stub and the YouTube rate limit disabled for the run
+(both set here unless already in the environment).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_VIDEO = {
+    "id": "stubvideo01",
+    "snippet": {
+        "title": "Stub video", "channelTitle": "Stub channel",
+        "publishedAt": "2024-01-01T00:00:00Z", "thumbnails": {},
+    },
+    "statistics": {"viewCount": "1", "likeCount": "1", "commentCount": "1"},
+}
+
+
+class Faults:
+    """
+    Faults the stub server injects, changed between runs with set(): the
+    next `fail` requests (-1: every request) either get an HTTP `status`
+    error or, with `stall` > 0, are held that many seconds and dropped
+    unanswered.  `requests` counts every request received.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.set()
+
+    def set(self, fail: int = 0, status: int = 503, stall: float = 0.0) -> None:
+        with self.lock:
+            self.fail, self.status, self.stall, self.requests = fail, status, stall, 0
+
+    def take(self) -> tuple[int | None, float]:
+        """Count a request; return (error status or None, stall seconds) for it."""
+        with self.lock:
+            self.requests += 1
+            if self.fail == 0:
+                return None, 0.0
+            if self.fail > 0:
+                self.fail -= 1
+            return (None, self.stall) if self.stall else (self.status, 0.0)
+
+
+def start_stub_server(connect_delay: float, faults: Faults | None = None) -> ThreadingHTTPServer:
+    """Serve videos.list on a free local port until server.shutdown()."""
+    faults = faults or Faults()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"            # keep-alive
+        disable_nagle_algorithm = True           # headers and body are separate writes
+
+        def setup(self):
+            time.sleep(connect_delay)            # once per connection
+            super().setup()
+
+        def do_GET(self):
+            status, stall = faults.take()
+            if stall:
+                time.sleep(stall)                # past the client's timeout
+                self.close_connection = True
+                return
+            payload = {"items": [_VIDEO]} if status is None else {"error": {
+                "code": status, "message": "injected fault",
+                "errors": [{"reason": "backendError", "message": "injected fault"}],
+            }}
+            body = json.dumps(payload).encode()
+            self.send_response(status or 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _timed(fn, requests: int) -> dict:
+    fn()                                         # first call pays one-off setup
+    times = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(times) * 1e3, 2),
+        "p95_ms"   : round(sorted(times)[int(len(times) * 0.95) - 1] * 1e3, 2),
+    }
+
+
+def run(requests: int = 100, connect_delay: float = 0.02) -> list[dict]:
+    server   = start_stub_server(connect_delay)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}/"
+    os.environ.setdefault("YOUTUBE_API_ENDPOINT", endpoint)
+    os.environ.setdefault("YOUTUBE_DAILY_UNITS", "0")
+    os.environ.setdefault("YOUTUBE_API_KEY", "bench")
+
+    import httplib2
+    from googleapiclient.discovery import build
+    from src.config import YOUTUBE_API_KEY, YOUTUBE_API_ENDPOINT, YOUTUBE_TIMEOUT
+    from src.youtube_api import get_video_metadata
+
+    def rebuild() -> None:
+        yt = build(
+            "youtube", "v3", developerKey=YOUTUBE_API_KEY,
+            static_discovery=True, cache_discovery=False,
+            client_options={"api_endpoint": YOUTUBE_API_ENDPOINT},
+        )
+        yt.videos().list(part="snippet,statistics", id=_VIDEO["id"]).execute(
+            http=httplib2.Http(timeout=YOUTUBE_TIMEOUT),
+        )
+
+    try:
+        return [
+            {"client": "rebuild", **_timed(rebuild, requests)},
+            {"client": "pooled", **_timed(lambda: get_video_metadata(_VIDEO["id"]), requests)},
+        ]
+    finally:
+        server.shutdown()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.youtube_client_bench",
+        description="YouTube request latency: client rebuilt per call vs pooled, on a stub server.",
+    )
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument(
+        "--connect-delay", type=float, default=0.02,
+        help="seconds the stub server stalls each new connection (handshake stand-in)",
+    )
+    args = parser.parse_args(argv)
+
+    rows = run(args.requests, args.connect_delay)
+    for row in rows:
+        print(json.dumps(row))
+    rebuild, pooled = rows
+    return 0 if pooled["median_ms"] < rebuild["median_ms"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())